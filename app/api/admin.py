@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.dependencies import require_admin
+from app.services import introspection
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+KEY_TYPE = Query("lineno", pattern="^(lineno|filename|traceback)$")
+
+@router.get("/memory")
+def memory():
+    """
+    This worker's RSS, entry counts and approximate sizes of every in-process
+    store and cache, and DB pool status (sync, async and replica engines)
+    """
+    return introspection.memory_report()
+
+@router.post("/tracemalloc/start")
+def start_tracemalloc(frames: int = Query(1, ge=1, le=50)):
+    """Start tracing allocations in this worker, keeping `frames` frames per trace"""
+    introspection.start_tracing(frames)
+    return introspection.tracemalloc_status()
+
+@router.post("/tracemalloc/stop")
+def stop_tracemalloc():
+    """Stop tracing and drop this worker's snapshots"""
+    introspection.stop_tracing()
+    return introspection.tracemalloc_status()
+
+@router.post("/tracemalloc/snapshots")
+def take_snapshot(key_type: str = KEY_TYPE, limit: int = Query(25, ge=1, le=500)):
+    """Take and keep a snapshot; returns its id and top allocations"""
+    try:
+        return introspection.take_snapshot(key_type, limit)
+    except RuntimeError as e:
+        raise HTTPException(409, str(e))
+
+@router.get("/tracemalloc/diff")
+def diff_snapshots(
+    from_id: int = Query(..., alias="from"),
+    to_id: int = Query(..., alias="to"),
+    key_type: str = KEY_TYPE,
+    limit: int = Query(25, ge=1, le=500)
+):
+    """Largest allocation growth between two snapshots taken in this worker"""
+    diff = introspection.diff_snapshots(from_id, to_id, key_type, limit)
+    if diff is None:
+        raise HTTPException(404, "Snapshot not found in this worker (evicted, or taken by another worker)")
+    return diff
+
+@router.delete("/tracemalloc/snapshots/{snapshot_id}")
+def delete_snapshot(snapshot_id: int):
+    if not introspection.delete_snapshot(snapshot_id):
+        raise HTTPException(404, "Snapshot not found")
+    return {"message": "Snapshot deleted"}
@@ -0,0 +1,52 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.db.session import get_async_read_db
+from app.models.launch_event import LaunchRollupDaily, LaunchRollupHourly
+from app.schemas.analytics import LaunchCount
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+@router.get("/launches", response_model=List[LaunchCount], response_model_exclude_none=True)
+async def launch_counts(
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    group_by: str = Query("context", pattern="^(platform|context|resource_link)$"),
+    platform_id: Optional[str] = None,
+    context_id: Optional[str] = None,
+    resource_link_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Resource link launch counts over time per platform, course (context)
+    or resource link (Deep Linking requests are not counted).
+    
+    Served from the hourly/daily rollups; the last few seconds of launches
+    may still be buffered. `since` is inclusive, `until` exclusive.
+    """
+    model = LaunchRollupHourly if granularity == "hour" else LaunchRollupDaily
+    columns = [model.bucket, model.platform_id]
+    if group_by in ("context", "resource_link"):
+        columns.append(model.context_id)
+    if group_by == "resource_link":
+        columns.append(model.resource_link_id)
+    
+    query = select(*columns, func.sum(model.launches).label("launches"))
+    if platform_id is not None:
+        query = query.where(model.platform_id == platform_id)
+    if context_id is not None:
+        query = query.where(model.context_id == context_id)
+    if resource_link_id is not None:
+        query = query.where(model.resource_link_id == resource_link_id)
+    if since is not None:
+        query = query.where(model.bucket >= (since if granularity == "hour" else since.date()))
+    if until is not None:
+        query = query.where(model.bucket < (until if granularity == "hour" else until.date()))
+    
+    result = await db.execute(query.group_by(*columns).order_by(*columns).limit(limit))
+    return [LaunchCount(**row._mapping) for row in result]
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.db.session import get_db
+from app.models.exercise import Exercise
+from app.schemas.exercise import ExerciseBase, ExerciseCreate, ExerciseResponse, ExerciseSearchResult
+from app.services import exercise_catalog
+
+router = APIRouter(prefix="/exercises", tags=["exercises"])
+
+def _to_response(exercise: Exercise) -> ExerciseResponse:
+    return ExerciseResponse(
+        id=exercise.id,
+        title=exercise.title,
+        description=exercise.description,
+        language=exercise.language,
+        tags=[t for t in (exercise.tags or "").split(",") if t],
+        active=exercise.active,
+        created_at=exercise.created_at,
+        updated_at=exercise.updated_at
+    )
+
+@router.post("/", response_model=ExerciseResponse, status_code=201)
+def create_exercise(exercise: ExerciseCreate, db: Session = Depends(get_db)):
+    """Add an exercise to the catalog"""
+    if db.get(Exercise, exercise.id):
+        raise HTTPException(400, "Exercise already exists")
+
+    db_exercise = Exercise(
+        id=exercise.id,
+        title=exercise.title,
+        description=exercise.description,
+        language=exercise.language,
+        tags=",".join(exercise.tags)
+    )
+    db.add(db_exercise)
+    db.commit()
+    db.refresh(db_exercise)
+    return _to_response(db_exercise)
+
+@router.get("/", response_model=List[ExerciseSearchResult])
+def search_exercises(
+    q: str = "",
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Search the catalog (prefix match on the last word, served from memory)"""
+    return [
+        ExerciseSearchResult(
+            id=entry.id,
+            title=entry.title,
+            description=entry.description,
+            language=entry.language
+        )
+        for entry in exercise_catalog.search(db, q, limit)
+    ]
+
+@router.get("/{exercise_id}", response_model=ExerciseResponse)
+def get_exercise(exercise_id: str, db: Session = Depends(get_db)):
+    """Get exercise by ID"""
+    exercise = db.get(Exercise, exercise_id)
+    if not exercise:
+        raise HTTPException(404, "Exercise not found")
+    return _to_response(exercise)
+
+@router.put("/{exercise_id}", response_model=ExerciseResponse)
+def update_exercise(exercise_id: str, update: ExerciseBase, db: Session = Depends(get_db)):
+    """Replace an exercise's catalog entry"""
+    exercise = db.get(Exercise, exercise_id)
+    if not exercise:
+        raise HTTPException(404, "Exercise not found")
+
+    exercise.title = update.title
+    exercise.description = update.description
+    exercise.language = update.language
+    exercise.tags = ",".join(update.tags)
+    db.commit()
+    db.refresh(exercise)
+    return _to_response(exercise)
+
+@router.delete("/{exercise_id}")
+def delete_exercise(exercise_id: str, db: Session = Depends(get_db)):
+    """Soft delete exercise (removes it from the picker)"""
+    exercise = db.get(Exercise, exercise_id)
+    if not exercise:
+        raise HTTPException(404, "Exercise not found")
+
+    exercise.active = False
+    db.commit()
+    return {"message": "Exercise deactivated"}
@@ -43,7 +43,7 @@ def get_lti_config_xml(request: Request):
         </lticm:options>
         <lticm:options name="assignment_selection">
             <lticm:property name="enabled">true</lticm:property>
-            <lticm:property name="message_type">LtiResourceLinkRequest</lticm:property>
+            <lticm:property name="message_type">LtiDeepLinkingRequest</lticm:property>
         </lticm:options>
     </blti:extensions>
     <blti:custom>
@@ -73,6 +73,10 @@ def get_lti_config(request: Request, response: Response):
                 "placements": [{
                     "placement": "course_navigation",
                     "target_link_uri": f"{base_url}/lti/launch"
+                }, {
+                    "placement": "assignment_selection",
+                    "message_type": "LtiDeepLinkingRequest",
+                    "target_link_uri": f"{base_url}/lti/launch"
                 }]
             }
         }],
@@ -1,25 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from urllib.parse import urlencode
 from jose import jwt as jose_jwt
 from datetime import datetime, timedelta
-from cryptography.hazmat.primitives import serialization
+from typing import List
+import html
 import json
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_read_db
+from app.core.dependencies import admission_control
 from app.schemas.lti import LtiLoginRequest
-from app.services import lti_service
+from app.services import launch_events, lti_service
 from app.models.user import User
-from app.core.security import load_private_key
+from app.core.security import sign_jwt
 from app.models.platform import Platform
+from app.models.exercise import Exercise
 
 router = APIRouter(prefix="/lti", tags=["LTI"])
 
-@router.get("/login")
-def lti_login(
+@router.get("/login", dependencies=[Depends(admission_control)])
+async def lti_login(
     request: Request,
-    db: Session = Depends(get_db)
+    read_db: AsyncSession = Depends(get_async_read_db)
 ):
     """OIDC Login Initiation - First step of LTI 1.3 launch"""
     params = dict(request.query_params)
@@ -33,10 +38,7 @@ def lti_login(
     client_id = params.get("client_id")
     lti_message_hint = params.get("lti_message_hint")
     
-    platform = db.query(Platform).filter(
-    Platform.client_id == client_id,
-    Platform.active == True
-).first()
+    platform = await lti_service.get_active_platform(read_db, client_id)
     if not platform:
         raise HTTPException(400, f"Unknown platform: {issuer}")
     
@@ -76,10 +78,7 @@ def lti_login(
 
 
 @router.get("/mock-auth")
-def mock_auth(
-    request: Request,
-    db: Session = Depends(get_db)
-):
+def mock_auth(request: Request):
     """TESTING ONLY: Mock LMS authorization endpoint"""
     params = dict(request.query_params)
     
@@ -91,8 +90,6 @@ def mock_auth(
     if not all([state, nonce, redirect_uri]):
         return HTMLResponse("<h1>Error: Missing parameters</h1>", status_code=400)
     
-    private_key = load_private_key()
-    
     payload = {
         "iss": "https://moodle.example.edu",
         "sub": "test_user_12345",
@@ -118,16 +115,7 @@ def mock_auth(
         }
     }
     
-    id_token = jose_jwt.encode(
-        payload,
-        private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        ).decode('utf-8'),
-        algorithm="RS256",
-        headers={"kid": "lti-key-1"}
-    )
+    id_token = sign_jwt(payload)
     
     return HTMLResponse(f"""
         <html>
@@ -146,11 +134,13 @@ def mock_auth(
     """)
 
 
-@router.post("/launch")
-def lti_launch(
+@router.post("/launch", dependencies=[Depends(admission_control)])
+async def lti_launch(
+    request: Request,
     id_token: str = Form(...),
     state: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
 ):
     """LTI Launch - Receive and validate JWT from LMS"""
     
@@ -161,10 +151,7 @@ def lti_launch(
     issuer = state_data["issuer"]
     client_id = state_data["client_id"]
     
-    platform = db.query(Platform).filter(
-        Platform.client_id == client_id,
-        Platform.active == True
-    ).first()
+    platform = await lti_service.get_active_platform(read_db, client_id)
     
     if not platform:
         raise HTTPException(400, f"Unknown platform: {issuer}")
@@ -176,7 +163,9 @@ def lti_launch(
         raise HTTPException(400, "Invalid or expired nonce")
     
     try:
-        payload = lti_service.validate_jwt_token(
+        # Off the event loop: may fetch the platform's JWKS on a cache miss
+        payload = await run_in_threadpool(
+            lti_service.validate_jwt_token,
             id_token,
             platform,
             expected_nonce=token_nonce,
@@ -201,17 +190,18 @@ def lti_launch(
         raise HTTPException(400, "Token missing 'sub' claim")
     
     # Create or update user
-    user = db.query(User).filter(
+    user = (await db.execute(select(User).where(
         User.platform_id == platform.id,
         User.lti_user_id == lti_user_id
-    ).first()
+    ))).scalar_one_or_none()
     
     if not user:
         user = User(
             platform_id=platform.id,
             lti_user_id=lti_user_id,
             email=email,
-            name=name
+            name=name,
+            last_launch_at=datetime.utcnow()
         )
         db.add(user)
     else:
@@ -219,12 +209,17 @@ def lti_launch(
         user.name = name
         user.last_launch_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    
+    launch_events.record_launch(platform.id, payload)
+    
+    message_type = payload.get(lti_service.MESSAGE_TYPE_CLAIM, "LtiResourceLinkRequest")
+    if message_type == "LtiDeepLinkingRequest":
+        return _deep_linking_picker(request, payload, platform, client_id)
     
     # Extract course and assignment info
-    course_context = payload.get('https://purl.imsglobal.org/spec/lti/claim/context', {})
-    resource_link = payload.get('https://purl.imsglobal.org/spec/lti/claim/resource_link', {})
+    course_context = payload.get(lti_service.CONTEXT_CLAIM, {})
+    resource_link = payload.get(lti_service.RESOURCE_LINK_CLAIM, {})
 
     # Success page
     html_content = """
@@ -285,4 +280,162 @@ def lti_launch(
             "Pragma": "no-cache",
             "Expires": "0"
         }
-    )
\ No newline at end of file
+    )
+
+
+def _deep_linking_picker(request: Request, payload: dict, platform: Platform, client_id: str):
+    """Render the exercise picker for an LtiDeepLinkingRequest"""
+    dl_settings = payload.get(lti_service.DEEP_LINKING_SETTINGS_CLAIM) or {}
+    return_url = dl_settings.get("deep_link_return_url")
+    if not return_url:
+        raise HTTPException(400, "Deep Linking request missing deep_link_return_url")
+    
+    accept_types = dl_settings.get("accept_types") or ["ltiResourceLink"]
+    if "ltiResourceLink" not in accept_types:
+        raise HTTPException(400, "Platform does not accept LTI resource links")
+    
+    accept_multiple = bool(dl_settings.get("accept_multiple", False))
+    session_token = lti_service.store_deep_link_session({
+        "platform_id": platform.id,
+        "client_id": client_id,
+        "signing_alg": platform.tool_signing_alg,
+        "deployment_id": payload.get(lti_service.DEPLOYMENT_ID_CLAIM),
+        "return_url": return_url,
+        "data": dl_settings.get("data"),
+        "accept_multiple": accept_multiple
+    })
+    
+    html_content = """
+    <!DOCTYPE html>
+    <html>
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1">
+            <title>Select Exercise</title>
+            <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.2.3/dist/css/bootstrap.min.css" rel="stylesheet">
+        </head>
+        <body>
+            <div class="container px-4 py-5">
+                <h1 class="h3 mb-3">Select {what}</h1>
+                <input id="q" class="form-control mb-3" type="search" placeholder="Search exercises..." autofocus>
+                <form method="POST" action="{action}">
+                    <input type="hidden" name="session" value="{session}">
+                    <div id="results" class="list-group mb-3"></div>
+                    <button type="submit" class="btn btn-primary">Add to course</button>
+                </form>
+            </div>
+            <script>
+                const input = document.getElementById("q");
+                const results = document.getElementById("results");
+                const inputType = "{input_type}";
+                let timer = null;
+                
+                async function search() {{
+                    const response = await fetch("{search_url}?q=" + encodeURIComponent(input.value));
+                    const exercises = await response.json();
+                    results.replaceChildren(...exercises.map((exercise) => {{
+                        const label = document.createElement("label");
+                        label.className = "list-group-item";
+                        const choice = document.createElement("input");
+                        choice.type = inputType;
+                        choice.name = "exercise_id";
+                        choice.value = exercise.id;
+                        choice.className = "form-check-input me-2";
+                        const title = document.createElement("strong");
+                        title.textContent = exercise.title;
+                        const details = document.createElement("div");
+                        details.className = "small text-muted";
+                        details.textContent = [exercise.language, exercise.description].filter(Boolean).join(" - ");
+                        label.append(choice, title, details);
+                        return label;
+                    }}));
+                }}
+                
+                input.addEventListener("input", () => {{
+                    clearTimeout(timer);
+                    timer = setTimeout(search, 150);
+                }});
+                search();
+            </script>
+        </body>
+    </html>
+    """.format(
+        what="exercises" if accept_multiple else "an exercise",
+        action=html.escape(str(request.url_for("deep_link_response"))),
+        session=html.escape(session_token),
+        input_type="checkbox" if accept_multiple else "radio",
+        search_url=html.escape(str(request.url_for("search_exercises")))
+    )
+    
+    return HTMLResponse(
+        content=html_content,
+        headers={"Cache-Control": "no-cache, no-store, must-revalidate"}
+    )
+
+
+@router.post("/deep-link")
+async def deep_link_response(
+    request: Request,
+    session: str = Form(...),
+    exercise_id: List[str] = Form([]),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Return the instructor's selection to the platform as a signed LtiDeepLinkingResponse"""
+    dl = lti_service.pop_deep_link_session(session)
+    if not dl:
+        raise HTTPException(400, "Invalid or expired deep linking session")
+    
+    if not dl["accept_multiple"]:
+        exercise_id = exercise_id[:1]
+    
+    exercises = {
+        exercise.id: exercise
+        for exercise in (await db.execute(select(Exercise).where(
+            Exercise.id.in_(exercise_id),
+            Exercise.active == True
+        ))).scalars()
+    } if exercise_id else {}
+    
+    launch_url = f"{request.base_url}lti/launch"  # url_for("lti_launch") would match /platforms/launch
+    content_items = [
+        {
+            "type": "ltiResourceLink",
+            "title": exercises[eid].title,
+            "text": exercises[eid].description or "",
+            "url": launch_url,
+            "custom": {"exercise_id": eid}
+        }
+        for eid in exercise_id if eid in exercises
+    ]
+    
+    now = datetime.utcnow()
+    response_payload = {
+        "iss": dl["client_id"],
+        "aud": dl["platform_id"],
+        "iat": now,
+        "exp": now + timedelta(minutes=5),
+        "nonce": lti_service.generate_nonce(),
+        lti_service.MESSAGE_TYPE_CLAIM: "LtiDeepLinkingResponse",
+        "https://purl.imsglobal.org/spec/lti/claim/version": "1.3.0",
+        lti_service.DEPLOYMENT_ID_CLAIM: dl["deployment_id"],
+        lti_service.CONTENT_ITEMS_CLAIM: content_items
+    }
+    if dl["data"] is not None:
+        response_payload[lti_service.DEEP_LINKING_DATA_CLAIM] = dl["data"]
+    
+    jwt_token = sign_jwt(response_payload, dl["signing_alg"])
+    
+    return HTMLResponse(f"""
+        <html>
+        <body>
+            <h3>Returning to your course...</h3>
+            <form id="deepLinkForm" method="POST" action="{html.escape(dl['return_url'])}">
+                <input type="hidden" name="JWT" value="{jwt_token}">
+                <button type="submit">Continue</button>
+            </form>
+            <script>
+                document.getElementById('deepLinkForm').submit();
+            </script>
+        </body>
+        </html>
+    """)
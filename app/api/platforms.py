@@ -1,79 +1,222 @@
 from datetime import datetime
+import base64
+import binascii
+import codecs
+import csv
 import json
-from fastapi import APIRouter, Depends, Form, HTTPException
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from typing import List
+import tempfile
+from collections import Counter
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, StreamingResponse
+from jose import jwt as jose_jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_read_db, open_read_session, mark_write, reads_primary, AsyncSessionLocal
 from app.models.platform import Platform
 from app.models.user import User
 from app.schemas.platform import PlatformCreate, PlatformResponse
-from app.services import lti_service
+from app.services import lti_service, platform_service
 
 router = APIRouter(prefix="/platforms", tags=["platforms"])
 
 @router.post("/", response_model=PlatformResponse, status_code=201)
-def create_platform(platform: PlatformCreate, db: Session = Depends(get_db)):
+async def create_platform(platform: PlatformCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Register a new LMS platform"""
-    existing = db.query(Platform).filter(Platform.id == platform.id).first()
+    existing = await db.get(Platform, platform.id)
     if existing:
         raise HTTPException(400, "Platform already registered")
     
-    # Convert Pydantic model to dict, then convert HttpUrl to str
-    platform_data = platform.model_dump()
-    platform_data["auth_login_url"] = str(platform_data["auth_login_url"])
-    platform_data["auth_token_url"] = str(platform_data["auth_token_url"])
-    platform_data["key_set_url"] = str(platform_data["key_set_url"])
-    
-    db_platform = Platform(**platform_data)
+    db_platform = Platform(**platform_service.platform_values(platform))
     db.add(db_platform)
-    db.commit()
-    db.refresh(db_platform)
+    await db.commit()
+    mark_write(response)
+    await db.refresh(db_platform)
     return db_platform
 
+def _encode_cursor(platform_id: str) -> str:
+    return base64.urlsafe_b64encode(platform_id.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        # validate=True: urlsafe_b64decode silently drops invalid characters
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+async def _platform_page(db: AsyncSession, after: Optional[str], limit: int) -> List[Platform]:
+    """Keyset page of active platforms ordered by id"""
+    query = select(Platform).where(Platform.active == True)
+    if after is not None:
+        query = query.where(Platform.id > after)
+    result = await db.execute(query.order_by(Platform.id).limit(limit))
+    return list(result.scalars())
+
 @router.get("/", response_model=List[PlatformResponse])
-def list_platforms(db: Session = Depends(get_db)):
-    """List all registered platforms"""
-    return db.query(Platform).filter(Platform.active == True).all()
+async def list_platforms(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    List active platforms, ordered by id.
+    
+    JSON responses are paginated: follow the X-Next-Cursor header (or the
+    Link header) until it is absent. format=ndjson streams every remaining
+    platform, one per line, fetching `limit` rows at a time.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    
+    if format == "ndjson":
+        primary = reads_primary(request)
+        
+        async def stream():
+            # Own session: the request-scoped one may be closed while we stream
+            async with await open_read_session(primary) as stream_db:
+                last = after
+                while True:
+                    page = await _platform_page(stream_db, last, limit)
+                    for platform in page:
+                        yield PlatformResponse.model_validate(platform).model_dump_json() + "\n"
+                    if len(page) < limit:
+                        break
+                    last = page[-1].id
+                    stream_db.expunge_all()
+        
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+    
+    # Fetch one extra row to know whether there is a next page
+    page = await _platform_page(db, after, limit + 1)
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = _encode_cursor(page[-1].id)
+        response.headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return page
+
+async def _aiter_lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body into text lines as it arrives"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+@router.post("/import")
+async def import_platforms(
+    request: Request,
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$"),
+    chunk_size: int = Query(platform_service.DEFAULT_CHUNK_SIZE, ge=1, le=5000)
+):
+    """
+    Bulk register platforms from a JSONL or CSV request body.
+    
+    The body is validated and inserted chunk by chunk as it arrives, so
+    memory stays flat however large the upload. The response is NDJSON,
+    one line per input row ("created", "exists", "duplicate" or "invalid"
+    with errors), followed by a summary line. Existing platforms are left
+    untouched. Quoted CSV fields may contain line breaks.
+    """
+    # Results are spooled to disk past 1MB; the body cannot be read from
+    # inside a StreamingResponse (it competes with disconnect detection)
+    results = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode="w+")
+    summary = Counter()
+    fieldnames = None
+    first_line = 1
+    chunk: List[str] = []
+    
+    async def flush(db: AsyncSession):
+        rows = platform_service.parse_rows(chunk, format, fieldnames=fieldnames, first_line=first_line)
+        for result in await platform_service.import_chunk_async(db, list(rows)):
+            summary[result["status"]] += 1
+            results.write(json.dumps(result) + "\n")
+    
+    async with AsyncSessionLocal() as db:
+        line_no = 0
+        in_quotes = False  # CSV: inside a quoted field that continues on the next line
+        async for line in _aiter_lines(request):
+            line_no += 1
+            if format == "csv":
+                # Keep the line break so csv sees one continuous stream and a
+                # quoted field spanning lines keeps its newline
+                line += "\n"
+                in_quotes ^= line.count('"') % 2 == 1
+            chunk.append(line)
+            if in_quotes:
+                continue  # never split a record between chunks (or off the header)
+            if format == "csv" and fieldnames is None:
+                fieldnames = next(csv.reader(chunk))
+                chunk = []
+                first_line = line_no + 1
+                continue
+            if len(chunk) >= chunk_size:
+                await flush(db)
+                chunk = []
+                first_line = line_no + 1
+        if chunk:
+            await flush(db)
+    
+    results.write(json.dumps({"summary": dict(summary)}) + "\n")
+    results.seek(0)
+    
+    def stream():
+        with results:
+            yield from results
+    
+    response = StreamingResponse(stream(), media_type="application/x-ndjson")
+    mark_write(response)
+    return response
 
 @router.get("/{platform_id}", response_model=PlatformResponse)
-def get_platform(platform_id: str, db: Session = Depends(get_db)):
+async def get_platform(platform_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """Get platform by ID"""
-    platform = db.query(Platform).filter(Platform.id == platform_id).first()
+    platform = await db.get(Platform, platform_id)
     if not platform:
         raise HTTPException(404, "Platform not found")
     return platform
 
 @router.delete("/{platform_id}")
-def delete_platform(platform_id: str, db: Session = Depends(get_db)):
+async def delete_platform(platform_id: str, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Soft delete platform"""
-    platform = db.query(Platform).filter(Platform.id == platform_id).first()
+    platform = await db.get(Platform, platform_id)
     if not platform:
         raise HTTPException(404, "Platform not found")
     
     platform.active = False
-    db.commit()
+    await db.commit()
+    mark_write(response)
     return {"message": "Platform deactivated"}
 
 
 @router.delete("/{platform_id:path}")  # Add :path to accept slashes
-def delete_platform_param(platform_id: str, db: Session = Depends(get_db)):
+async def delete_platform_param(platform_id: str, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Soft delete platform"""
-    platform = db.query(Platform).filter(Platform.id == platform_id).first()
+    platform = await db.get(Platform, platform_id)
     if not platform:
         raise HTTPException(404, "Platform not found")
     
     platform.active = False
-    db.commit()
+    await db.commit()
+    mark_write(response)
     return {"message": "Platform deactivated"}
 
 
 @router.post("/launch")
-def lti_launch(
+async def lti_launch(
     id_token: str = Form(...),
     state: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """LTI Launch - Receive and validate JWT from LMS"""
     
@@ -86,7 +229,7 @@ def lti_launch(
     client_id = state_data["client_id"]
     
     # Get platform
-    platform = lti_service.get_platform_by_issuer(db, issuer)
+    platform = await lti_service.get_platform_by_issuer(db, issuer)
     if not platform:
         raise HTTPException(400, f"Unknown platform: {issuer}")
     
@@ -98,9 +241,10 @@ def lti_launch(
     if not lti_service.validate_nonce(token_nonce):
         raise HTTPException(400, "Invalid or expired nonce")
     
-    # Now validate JWT properly
+    # Now validate JWT properly (may fetch the platform's JWKS on a cache miss)
     try:
-        payload = lti_service.validate_jwt_token(
+        payload = await run_in_threadpool(
+            lti_service.validate_jwt_token,
             id_token,
             platform,
             expected_nonce=token_nonce,
@@ -118,10 +262,10 @@ def lti_launch(
         raise HTTPException(400, "Token missing 'sub' claim")
     
     # Create or update user
-    user = db.query(User).filter(
+    user = (await db.execute(select(User).where(
         User.platform_id == platform.id,
         User.lti_user_id == lti_user_id
-    ).first()
+    ))).scalar_one_or_none()
     
     if not user:
         user = User(
@@ -136,8 +280,7 @@ def lti_launch(
         user.name = name # type: ignore
         user.last_launch_at = datetime.utcnow() # type: ignore
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     
     # Success page
     return HTMLResponse(f"""
@@ -0,0 +1,42 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from app.core.dependencies import require_admin
+from app.services import user_export
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+async def export_users(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    platform_id: Optional[str] = None,
+    context_id: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="last_launch_at >= since"),
+    until: Optional[datetime] = Query(None, description="last_launch_at < until"),
+    chunk_size: int = Query(user_export.DEFAULT_CHUNK_SIZE, ge=1, le=10000)
+):
+    """
+    Stream users as CSV or NDJSON, ordered by id.
+    
+    Rows come from a server-side cursor `chunk_size` at a time, so large
+    rosters are never held in memory. Pass the previous export's start time
+    as `since` for an incremental export.
+    
+    Requires the admin Bearer token (404 when ADMIN_TOKEN is unset); use
+    `python -m app.cli export-users` for local exports without one.
+    """
+    stream = user_export.stream_export(
+        format,
+        chunk_size,
+        platform_id=platform_id,
+        since=since,
+        until=until,
+        context_id=context_id
+    )
+    return StreamingResponse(
+        stream,
+        media_type=user_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'}
+    )
@@ -0,0 +1,111 @@
+"""
+Maintenance commands
+
+Usage:
+    python -m app.cli gc-blobs
+    python -m app.cli import-platforms platforms.jsonl
+    python -m app.cli import-platforms platforms.csv --format csv
+    python -m app.cli export-users --platform-id https://canvas.instructure.com -o users.csv
+    python -m app.cli export-users --since 2024-09-01T00:00:00 --format ndjson
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+from datetime import datetime
+
+from app.db.session import SessionLocal
+
+
+def gc_blobs(args):
+    """Delete submission blobs that no submission row references"""
+    from app.services import submission_service
+
+    db = SessionLocal()
+    try:
+        removed = submission_service.collect_garbage(db)
+    finally:
+        db.close()
+    print(f"Removed {removed} unreferenced blob(s)")
+
+
+def import_platforms(args):
+    """Bulk register platforms from a JSONL or CSV file ('-' for stdin)"""
+    from app.services import platform_service
+
+    fmt = args.format or ("csv" if args.file.endswith(".csv") else "jsonl")
+    source = sys.stdin if args.file == "-" else open(args.file, newline="", encoding="utf-8-sig")
+    summary = Counter()
+
+    db = SessionLocal()
+    try:
+        for result in platform_service.import_platforms(db, source, fmt, args.chunk_size):
+            summary[result["status"]] += 1
+            if result["status"] != "created" or args.verbose:
+                print(json.dumps(result))
+    finally:
+        db.close()
+        if source is not sys.stdin:
+            source.close()
+
+    print(json.dumps({"summary": dict(summary)}))
+    if summary["invalid"]:
+        sys.exit(1)
+
+
+def export_users(args):
+    """Stream users as CSV or NDJSON to a file or stdout"""
+    from app.services import user_export
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    db = SessionLocal()
+    try:
+        for chunk in user_export.iter_export(
+            db,
+            args.format,
+            args.chunk_size,
+            platform_id=args.platform_id,
+            since=args.since,
+            until=args.until,
+            context_id=args.context_id
+        ):
+            out.write(chunk)
+    finally:
+        db.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv=None):
+    # Make sure every model is registered before touching tables
+    import app.main  # noqa: F401
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gc = commands.add_parser("gc-blobs", help=gc_blobs.__doc__)
+    gc.set_defaults(func=gc_blobs)
+
+    imp = commands.add_parser("import-platforms", help=import_platforms.__doc__)
+    imp.add_argument("file")
+    imp.add_argument("--format", choices=["jsonl", "csv"], help="default: from file extension")
+    imp.add_argument("--chunk-size", type=int, default=500)
+    imp.add_argument("-v", "--verbose", action="store_true", help="also print created rows")
+    imp.set_defaults(func=import_platforms)
+
+    exp = commands.add_parser("export-users", help=export_users.__doc__)
+    exp.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    exp.add_argument("--platform-id")
+    exp.add_argument("--context-id", help="users with a logged launch in this course")
+    exp.add_argument("--since", type=datetime.fromisoformat, help="last_launch_at >= SINCE")
+    exp.add_argument("--until", type=datetime.fromisoformat, help="last_launch_at < UNTIL")
+    exp.add_argument("--chunk-size", type=int, default=1000)
+    exp.add_argument("-o", "--output", help="default: stdout")
+    exp.set_defaults(func=export_users)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
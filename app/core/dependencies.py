@@ -0,0 +1,72 @@
+import math
+import secrets
+from typing import Optional
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.services import lti_service
+from app.services.rate_limiter import limiter
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Client address. Behind a proxy listed in server_forwarded_allow_ips the
+    server has already replaced it with the address that proxy saw, so a
+    client cannot pick its own bucket with a forged X-Forwarded-For.
+    """
+    return request.client.host if request.client else "unknown"
+
+
+def _reject(retry_after: float):
+    raise HTTPException(
+        429,
+        "Too many requests",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+async def _client_key(request: Request) -> Optional[str]:
+    """issuer|client_id named by a login (query) or a launch (its state entry)"""
+    issuer = request.query_params.get("iss")
+    if issuer:
+        return f"{issuer}|{request.query_params.get('client_id', '')}"
+
+    if request.method == "POST":
+        # The form is cached on the request, so the route still gets it
+        form = await request.form()
+        state_data = lti_service.peek_state(str(form.get("state") or ""))
+        if state_data:
+            return f"{state_data['issuer']}|{state_data['client_id']}"
+    return None
+
+
+async def admission_control(request: Request):
+    """
+    Token-bucket admission for unauthenticated LTI endpoints.
+
+    Runs before the route touches the database or consumes state/nonces:
+    first per client IP, then per issuer/client_id when the request names
+    one (a launch with an unknown state is rejected by the route anyway).
+    """
+    if not settings.rate_limit_enabled:
+        return
+
+    allowed, retry_after = await limiter.check("ip", get_client_ip(request))
+    if not allowed:
+        _reject(retry_after)
+
+    client_key = await _client_key(request)
+    if client_key:
+        allowed, retry_after = await limiter.check("client", client_key)
+        if not allowed:
+            _reject(retry_after)
+
+
+def require_admin(request: Request):
+    """Bearer settings.admin_token; the admin API does not exist without one"""
+    if not settings.admin_token:
+        raise HTTPException(404, "Not Found")
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.admin_token.encode()):
+        raise HTTPException(401, "Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
@@ -1,9 +1,12 @@
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 from cryptography.hazmat.backends import default_backend
-import base64
-import json
+from functools import lru_cache
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+from typing import Optional
+import jwt
 from pathlib import Path
+from app.core.config import settings
 
 # Directory to store keys
 KEYS_DIR = Path(__file__).parent.parent.parent / "keys"
@@ -12,6 +15,16 @@ KEYS_DIR.mkdir(exist_ok=True)
 PRIVATE_KEY_PATH = KEYS_DIR / "private_key.pem"
 PUBLIC_KEY_PATH = KEYS_DIR / "public_key.pem"
 
+# Tool signing keys by JWS algorithm. All of them are published in the
+# JWKS; settings.tool_key_algorithm picks the default and a platform can
+# override it (Platform.tool_signing_alg), e.g. to stay on RS256.
+# ES256/EdDSA sign several times faster than RSA-2048 (benchmarks/signing.py).
+SIGNING_KEYS = {
+    "RS256": {"kid": "lti-key-1", "path": PRIVATE_KEY_PATH},
+    "ES256": {"kid": "lti-key-es256", "path": KEYS_DIR / "es256_private_key.pem"},
+    "EdDSA": {"kid": "lti-key-eddsa", "path": KEYS_DIR / "eddsa_private_key.pem"},
+}
+
 def generate_rsa_keypair():
     """Generate RSA key pair and save to files"""
     # Generate private key
@@ -62,28 +75,70 @@ def load_public_key():
             backend=default_backend()
         )
 
-def get_jwks():
-    """Generate JWKS (JSON Web Key Set) from public key"""
-    public_key = load_public_key()
+def _generate_signing_key(algorithm: str):
+    """Generate and save the private key for a non-RSA algorithm"""
+    if algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unsupported signing algorithm: {algorithm}")
     
-    # Get public numbers (for JWK format)
-    public_numbers = public_key.public_numbers()
-    
-    # Convert to base64url format (required by JWK spec)
-    def int_to_base64url(num):
-        num_bytes = num.to_bytes((num.bit_length() + 7) // 8, byteorder='big')
-        return base64.urlsafe_b64encode(num_bytes).rstrip(b'=').decode('utf-8')
+    with open(SIGNING_KEYS[algorithm]["path"], 'wb') as f:
+        f.write(private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ))
+    return private_key
+
+@lru_cache(maxsize=None)
+def load_signing_key(algorithm: str):
+    """Private key object for a signing algorithm, loaded (or generated) once per process"""
+    if algorithm not in SIGNING_KEYS:
+        raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+    if algorithm == "RS256":
+        return load_private_key()
     
-    # Build JWK
-    jwk = {
-        "kty": "RSA",
-        "use": "sig",
-        "kid": "lti-key-1",  # Key ID
-        "alg": "RS256",
-        "n": int_to_base64url(public_numbers.n),  # modulus
-        "e": int_to_base64url(public_numbers.e),  # exponent
-    }
+    path = SIGNING_KEYS[algorithm]["path"]
+    if not path.exists():
+        return _generate_signing_key(algorithm)
+    with open(path, 'rb') as f:
+        return serialization.load_pem_private_key(f.read(), password=None)
+
+def preload_keys():
+    """Load every signing key and build the JWKS (e.g. before forking workers)"""
+    for algorithm in SIGNING_KEYS:
+        load_signing_key(algorithm)
+    get_jwks()
+
+def sign_jwt(payload: dict, algorithm: Optional[str] = None) -> str:
+    """Sign a JWT with the tool key for ``algorithm`` (default: settings.tool_key_algorithm)"""
+    algorithm = algorithm or settings.tool_key_algorithm
+    return jwt.encode(
+        payload,
+        load_signing_key(algorithm),
+        algorithm=algorithm,
+        headers={"kid": SIGNING_KEYS[algorithm]["kid"]}
+    )
+
+@lru_cache(maxsize=1)
+def get_jwks():
+    """JWKS (JSON Web Key Set) with the public key of every tool signing key"""
+    keys = []
+    for algorithm, key_info in SIGNING_KEYS.items():
+        public_key = load_signing_key(algorithm).public_key()
+        if algorithm == "RS256":
+            jwk = RSAAlgorithm.to_jwk(public_key, as_dict=True)  # kty RSA, n, e
+        elif algorithm == "ES256":
+            jwk = ECAlgorithm.to_jwk(public_key, as_dict=True)  # kty EC, crv P-256, x, y
+        else:
+            jwk = OKPAlgorithm.to_jwk(public_key, as_dict=True)  # kty OKP, crv Ed25519, x
+        jwk.update({"use": "sig", "kid": key_info["kid"], "alg": algorithm})
+        keys.append(jwk)
     
+    # Default key first, for platforms that just take the first key
+    keys.sort(key=lambda k: k["alg"] != settings.tool_key_algorithm)
     return {
-        "keys": [jwk]
-    }
\ No newline at end of file
+        "keys": keys
+    }
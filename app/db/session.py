@@ -1,14 +1,123 @@
+import itertools
+import math
+import time
+from typing import Dict, List
+from fastapi import Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.db.base import Base
 
-engine = create_engine(settings.database_url)
+# Sync driver -> asyncio driver for the same database
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    """Rewrite a sync database URL to use an asyncio driver"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url  # already async (or a driver we don't know how to map)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+def engine_options(url: str) -> dict:
+    """Pool sizing; SQLite's default pools don't take these arguments"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_pre_ping": True,
+    }
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_database_url = settings.async_database_url or to_async_url(settings.database_url)
+async_engine = create_async_engine(async_database_url, **engine_options(async_database_url))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Read replicas (async only). Reads go to a replica unless the client
+# mutated platforms within the last read_your_writes_seconds: mark_write()
+# sets a short-lived cookie on the write's response and requests carrying
+# it read from the primary, so an admin who just registered a platform does
+# not read stale data back. Other clients may still see replica lag.
+replica_engines: List = [
+    create_async_engine(to_async_url(url), **engine_options(to_async_url(url)))
+    for url in settings.database_replica_urls
+]
+_replica_down_until: Dict[int, float] = {}
+_replica_round_robin = itertools.count()
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+def mark_write(response: Response):
+    """Route this client's reads to the primary for the read-your-writes window"""
+    until = time.time() + settings.read_your_writes_seconds
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        f"{until:.3f}",
+        max_age=math.ceil(settings.read_your_writes_seconds),
+        httponly=True,
+        samesite="lax"
+    )
+
+def reads_primary(request: Request) -> bool:
+    """True while the client is inside the window started by its own write"""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, "")) > time.time()
+    except ValueError:
+        return False
+
+async def open_read_session(primary: bool = False) -> AsyncSession:
+    """Open a session on a healthy replica, else (or if asked to) on the primary"""
+    now = time.monotonic()
+    if replica_engines and not primary:
+        start = next(_replica_round_robin)
+        for i in range(len(replica_engines)):
+            index = (start + i) % len(replica_engines)
+            if _replica_down_until.get(index, 0) > now:
+                continue
+            
+            session = AsyncSessionLocal(bind=replica_engines[index])
+            try:
+                await session.connection()  # fail over now, not mid-request
+                return session
+            except (DBAPIError, OSError) as e:
+                await session.close()
+                _replica_down_until[index] = now + settings.replica_retry_seconds
+                print(f"Replica {index} unavailable, falling back: {e}")
+    
+    return AsyncSessionLocal()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Async session: DB waits yield the event loop instead of holding a threadpool thread"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    """Session for read-only queries: a healthy replica, else the primary"""
+    db = await open_read_session(reads_primary(request))
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from sqlalchemy.orm import Session
 from app.core.config import settings
@@ -5,25 +7,50 @@ from app.db.session import get_db, engine, Base
 from app.api import platforms
 from app.api.lti import launch
 from sqlalchemy.sql import text
-from app.api import platforms, jwks 
+from app.api import platforms, jwks, exercises, analytics, users, admin
 
 # Import models BEFORE creating tables
 from app.models.platform import Platform
 from app.models.user import User
+from app.models.submission import Submission
+from app.models.exercise import Exercise
+from app.models.rate_limit import RateLimitBucket
+from app.models.launch_event import LaunchEvent, LaunchRollupHourly, LaunchRollupDaily
+from app.services.rate_limiter import limiter
+from app.services import exercise_catalog, jwks_refresher, launch_events
 
 # NOW create tables (models are registered with Base)
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(asyncio.to_thread(exercise_catalog.warm_up))]
+    if settings.jwks_refresh_enabled:
+        tasks.append(asyncio.create_task(jwks_refresher.run(stop)))
+    if settings.launch_events_enabled:
+        tasks.append(asyncio.create_task(launch_events.run(stop)))
+    
+    yield
+    
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
 app = FastAPI(
     title=settings.app_name,
     version="0.1.0",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # Register routers
 app.include_router(platforms.router)
 app.include_router(launch.router)
 app.include_router(jwks.router)
+app.include_router(exercises.router)
+app.include_router(analytics.router)
+app.include_router(users.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def read_root():
@@ -36,6 +63,21 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
+@app.get("/health/admission")
+def admission_stats():
+    """Allowed/rejected counters for /lti/login and /lti/launch"""
+    return limiter.get_stats()
+
+@app.get("/health/jwks")
+def jwks_health():
+    """Platform key refresh status (last success/error, number of keys)"""
+    return jwks_refresher.get_health()
+
+@app.get("/health/launch-events")
+def launch_event_stats():
+    """Launch event buffer size, flushed/dropped counters and last flush error"""
+    return launch_events.get_stats()
+
 @app.get("/db-test")
 def test_database(db: Session = Depends(get_db)):
     """Test database connection"""
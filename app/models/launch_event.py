@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Date, DateTime, Integer, String, Index
+from app.db.base import Base
+
+class LaunchEvent(Base):
+    """
+    Append-only record of every successful launch.
+
+    On PostgreSQL the table is range-partitioned by month on occurred_at
+    (see launch_events.ensure_partitions), so retention drops whole
+    partitions instead of deleting rows.
+    """
+    __tablename__ = "launch_events"
+
+    # Partitioned tables need the partition key in the primary key
+    event_id = Column(String(32), primary_key=True)  # uuid4 hex, assigned when buffered
+    occurred_at = Column(DateTime(timezone=True), primary_key=True)
+    platform_id = Column(String, nullable=False)
+    deployment_id = Column(String(255))
+    lti_user_id = Column(String(255), nullable=False)
+    context_id = Column(String(255))
+    resource_link_id = Column(String(255))
+    message_type = Column(String(64))
+
+    __table_args__ = (
+        Index("ix_launch_events_platform_occurred", "platform_id", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+class LaunchRollupHourly(Base):
+    """Launch counts per hour; missing context/resource link ids are stored as ''"""
+    __tablename__ = "launch_rollup_hourly"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # start of the hour (UTC)
+    platform_id = Column(String, primary_key=True)
+    context_id = Column(String(255), primary_key=True, default="")
+    resource_link_id = Column(String(255), primary_key=True, default="")
+    launches = Column(Integer, nullable=False, default=0)
+
+class LaunchRollupDaily(Base):
+    """Launch counts per UTC day"""
+    __tablename__ = "launch_rollup_daily"
+
+    bucket = Column(Date, primary_key=True)
+    platform_id = Column(String, primary_key=True)
+    context_id = Column(String(255), primary_key=True, default="")
+    resource_link_id = Column(String(255), primary_key=True, default="")
+    launches = Column(Integer, nullable=False, default=0)
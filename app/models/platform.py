@@ -15,6 +15,7 @@ class Platform(Base):
     auth_token_url: Mapped[str] = mapped_column(String)
     key_set_url: Mapped[str] = mapped_column(String)
     deployment_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    tool_signing_alg: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)  # None: settings.tool_key_algorithm
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=func.now(), nullable=True)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Float
+from app.db.base import Base
+
+class RateLimitBucket(Base):
+    """Token bucket shared by all workers (rate_limit_backend = "database")"""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(512), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False, index=True)  # epoch seconds
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Optional, Union
+
+class LaunchCount(BaseModel):
+    """Launches in one hour/day bucket; ids not grouped on are omitted"""
+    bucket: Union[datetime, date]
+    platform_id: str
+    context_id: Optional[str] = None
+    resource_link_id: Optional[str] = None
+    launches: int
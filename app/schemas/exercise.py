@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+class ExerciseBase(BaseModel):
+    title: str
+    description: Optional[str] = None
+    language: Optional[str] = None
+    tags: List[str] = []
+
+class ExerciseCreate(ExerciseBase):
+    id: str  # slug
+
+class ExerciseResponse(ExerciseBase):
+    id: str
+    active: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class ExerciseSearchResult(BaseModel):
+    """Lightweight search hit served from the in-memory catalog index"""
+    id: str
+    title: str
+    description: Optional[str] = None
+    language: Optional[str] = None
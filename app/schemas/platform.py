@@ -1,6 +1,6 @@
 from pydantic import BaseModel, HttpUrl
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 class PlatformBase(BaseModel):
     name: str
@@ -9,6 +9,7 @@ class PlatformBase(BaseModel):
     auth_token_url: HttpUrl
     key_set_url: HttpUrl
     deployment_id: Optional[str] = None
+    tool_signing_alg: Optional[Literal["RS256", "ES256", "EdDSA"]] = None  # e.g. RS256 if the LMS accepts nothing else
 
 class PlatformCreate(PlatformBase):
     id: str  # issuer URL
@@ -0,0 +1,133 @@
+"""
+Production server
+
+Usage:
+    lti-lab-serve
+    python -m app.serve --workers 4 --port 8080
+    python -m app.serve --workers auto   # one per CPU
+
+It runs one worker unless told otherwise: LTI login state, nonces and deep
+linking sessions live in each worker's memory, so several workers are only
+safe behind a load balancer that keeps a browser on the same worker.
+
+With gunicorn installed (``pip install .[server]``, not available on
+Windows) the app is imported and the tool keys loaded once in the master
+process (preload_app) and then forked, so workers share that memory
+copy-on-write and never race to generate missing key files. Each worker
+runs uvicorn; uvloop and httptools are used when installed.
+
+Without gunicorn it falls back to ``uvicorn.run`` with the same settings,
+where every worker imports the app on its own.
+
+On SIGTERM workers stop accepting connections, finish in-flight requests
+(up to server_graceful_timeout_seconds) and run the app's lifespan
+shutdown, which flushes the launch event buffer.
+"""
+import argparse
+import importlib.util
+import os
+
+from app.core.config import settings
+
+
+def default_workers() -> int:
+    """One worker per CPU this process may run on (async workers are not I/O-bound threads)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def parse_workers(value: str) -> int:
+    if value == "auto":
+        return default_workers()
+    workers = int(value)
+    if workers < 1:
+        raise argparse.ArgumentTypeError("must be at least 1 (or 'auto')")
+    return workers
+
+
+def worker_class() -> str:
+    if importlib.util.find_spec("uvicorn_worker"):
+        return "uvicorn_worker.UvicornWorker"
+    return "uvicorn.workers.UvicornWorker"  # deprecated in newer uvicorn releases
+
+
+def _post_fork(server, worker):
+    # Pooled connections opened in the master (create_all at import) must
+    # not be shared with the children; drop them without closing the sockets
+    from app.db.session import async_engine, engine, replica_engines
+
+    engine.dispose(close=False)
+    for async_db_engine in [async_engine, *replica_engines]:
+        async_db_engine.sync_engine.dispose(close=False)
+
+
+def serve_gunicorn(options: dict):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.core.security import preload_keys
+            from app.main import app
+
+            preload_keys()
+            return app
+
+    Application().run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="lti-lab-serve")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=parse_workers, default=settings.server_workers)
+    args = parser.parse_args(argv)
+
+    if args.workers > 1:
+        print(
+            f"Running {args.workers} workers: LTI login state and nonces are per worker, "
+            "so the load balancer must use session affinity"
+        )
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    print(f"Serving on {args.host}:{args.port} with {args.workers} worker(s), loop={loop}, http={http}")
+
+    if importlib.util.find_spec("gunicorn"):
+        serve_gunicorn({
+            "bind": f"{args.host}:{args.port}",
+            "workers": args.workers,
+            "worker_class": worker_class(),
+            "preload_app": True,
+            "post_fork": _post_fork,
+            "keepalive": settings.server_keepalive_seconds,
+            "backlog": settings.server_backlog,
+            "graceful_timeout": settings.server_graceful_timeout_seconds,
+            "timeout": settings.server_worker_timeout_seconds,
+            "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        })
+        return
+
+    import uvicorn
+
+    print("gunicorn not installed: workers will not share preloaded memory")
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="auto",
+        http="auto",
+        timeout_keep_alive=settings.server_keepalive_seconds,
+        backlog=settings.server_backlog,
+        timeout_graceful_shutdown=settings.server_graceful_timeout_seconds,
+        forwarded_allow_ips=settings.server_forwarded_allow_ips,
+    )
+
+
+if __name__ == "__main__":
+    main()
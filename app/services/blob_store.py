@@ -0,0 +1,231 @@
+"""
+Content-addressed blob storage for student submissions.
+
+Blobs are keyed by the SHA-256 of their *uncompressed* content, so a student
+resubmitting identical code costs one hash and one stat() call. Files are
+laid out in two levels of shard directories (``ab/cd/abcd...``) so no single
+directory grows to hundreds of thousands of entries.
+
+Each blob is stored as exactly one file whose suffix records how it was
+encoded (``.zst``, ``.gz`` or no suffix for raw). Content that does not
+shrink under compression (zip archives, images, ...) is stored raw, which
+also lets large raw artifacts be served straight from a memory map.
+"""
+import gzip
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Set, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+SUFFIXES = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+_TMP_PREFIX = ".tmp-"
+_TOMBSTONE_PREFIX = ".gc-"
+
+
+@dataclass
+class BlobInfo:
+    """Result of storing a blob"""
+    hash: str
+    size: int         # uncompressed size in bytes
+    stored_size: int  # size on disk
+    created: bool     # False if the blob was already present (deduplicated)
+
+
+class BlobStore:
+    """Local filesystem backend with sharded directories"""
+
+    def __init__(
+        self,
+        root,
+        compression: str = "zstd",
+        compression_level: int = 3,
+        mmap_threshold: int = 1024 * 1024,
+    ):
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.compression_level = compression_level
+        self.mmap_threshold = mmap_threshold
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """Content address of a blob"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _shard_dir(self, blob_hash: str) -> Path:
+        return self.root / blob_hash[:2] / blob_hash[2:4]
+
+    def _find(self, blob_hash: str) -> Optional[Path]:
+        """Return the on-disk path of a blob, whatever its encoding"""
+        shard = self._shard_dir(blob_hash)
+        for suffix in SUFFIXES.values():
+            path = shard / f"{blob_hash}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def exists(self, blob_hash: str) -> bool:
+        return self._find(blob_hash) is not None
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def _compress(self, data: bytes) -> Tuple[bytes, str]:
+        if self.compression == "zstd":
+            compressed = zstandard.ZstdCompressor(level=self.compression_level).compress(data)
+        elif self.compression == "gzip":
+            compressed = gzip.compress(data, compresslevel=min(self.compression_level * 2, 9), mtime=0)
+        else:
+            return data, ""
+
+        # Not worth it: keep raw so reads can be memory-mapped
+        if len(compressed) >= len(data):
+            return data, ""
+        return compressed, SUFFIXES[self.compression]
+
+    def put(self, data: bytes) -> BlobInfo:
+        """Store a blob, deduplicating by content hash"""
+        blob_hash = self.hash_bytes(data)
+
+        existing = self._find(blob_hash)
+        if existing is not None:
+            # Refresh mtime so the garbage collector's grace period covers
+            # the metadata row that is about to reference this blob again.
+            # If GC has just moved it away, fall through and write it anew.
+            try:
+                os.utime(existing)
+                return BlobInfo(blob_hash, len(data), existing.stat().st_size, created=False)
+            except FileNotFoundError:
+                pass
+
+        encoded, suffix = self._compress(data)
+        shard = self._shard_dir(blob_hash)
+        shard.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file and rename, so readers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(prefix=_TMP_PREFIX, dir=shard)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encoded)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, shard / f"{blob_hash}{suffix}")
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return BlobInfo(blob_hash, len(data), len(encoded), created=True)
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def open(self, blob_hash: str) -> Iterator[memoryview]:
+        """
+        Yield the blob content as a read-only buffer.
+
+        Large raw blobs are memory-mapped and never copied into the heap;
+        large compressed blobs are decompressed straight from the mapping.
+        The buffer is only valid inside the ``with`` block.
+        """
+        path = self._find(blob_hash)
+        if path is None:
+            raise KeyError(blob_hash)
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.mmap_threshold or size == 0:
+                yield memoryview(self._decode(path.suffix, f.read()))
+                return
+
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if path.suffix in (".zst", ".gz"):
+                    yield memoryview(self._decode(path.suffix, mm))
+                else:
+                    view = memoryview(mm)
+                    try:
+                        yield view
+                    finally:
+                        view.release()
+            finally:
+                mm.close()
+
+    def read(self, blob_hash: str) -> bytes:
+        """Return the full uncompressed blob content"""
+        with self.open(blob_hash) as buf:
+            return bytes(buf)
+
+    @staticmethod
+    def _decode(suffix: str, data) -> bytes:
+        if suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError("Blob is zstd-compressed but 'zstandard' is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if suffix == ".gz":
+            return gzip.decompress(data)
+        return bytes(data)
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def collect_garbage(self, referenced: Set[str], grace_seconds: int = 3600) -> int:
+        """
+        Delete blobs that no metadata row references.
+
+        Blobs (and abandoned temp files) younger than ``grace_seconds`` are
+        kept, so a blob written just before its row is committed survives.
+
+        An unreferenced blob is first renamed to a tombstone and its mtime
+        checked again: a concurrent ``put()`` of the same content either
+        touched it before the rename (the blob is restored) or finds it
+        gone and writes it again.
+        """
+        cutoff = time.time() - grace_seconds
+        removed = 0
+
+        for path in self.root.glob("*/*/*"):
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+                if path.name.startswith((_TMP_PREFIX, _TOMBSTONE_PREFIX)):
+                    path.unlink()  # abandoned write, or a GC run that died midway
+                    removed += 1
+                    continue
+                if path.name.split(".", 1)[0] in referenced:
+                    continue
+
+                tombstone = path.with_name(_TOMBSTONE_PREFIX + path.name)
+                os.rename(path, tombstone)
+                if tombstone.stat().st_mtime > cutoff and not path.exists():
+                    os.rename(tombstone, path)  # put() reused it meanwhile
+                    continue
+                tombstone.unlink()
+                removed += 1
+            except FileNotFoundError:
+                continue
+
+        return removed
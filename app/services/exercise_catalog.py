@@ -0,0 +1,226 @@
+"""
+In-memory search index over the exercise catalog.
+
+The Deep Linking picker searches as the instructor types, so every keystroke
+hits ``search()``. Rather than running ``ILIKE '%...%'`` over the exercises
+table, we keep an inverted index in process memory:
+
+- ``_postings`` maps each token to the set of exercise positions containing it
+  (full-text AND over complete words)
+- ``_vocabulary`` is the sorted token list, so the word still being typed is
+  matched as a prefix with two bisects instead of a scan
+
+The index is rebuilt after any committed Exercise insert/update/delete in
+this process, and after ``exercise_cache_ttl_seconds`` to pick up changes
+made by other workers. Rebuilds run in a background thread while searches
+keep using the previous index, so a rebuild never sits on the request path;
+only a search arriving before the startup warm-up has finished builds it.
+"""
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.exercise import Exercise
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric words"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class CatalogEntry:
+    id: str
+    title: str
+    description: Optional[str] = None
+    language: Optional[str] = None
+    tags: Optional[str] = None
+
+
+class ExerciseIndex:
+    """Immutable prefix/full-text index; rebuilt wholesale on change"""
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        # Position in this list doubles as the result rank (title order)
+        self.entries: List[CatalogEntry] = sorted(entries, key=lambda e: (e.title.lower(), e.id))
+        self._postings: Dict[str, Set[int]] = {}
+
+        for pos, entry in enumerate(self.entries):
+            text = " ".join(filter(None, [entry.id, entry.title, entry.description, entry.language, entry.tags]))
+            for token in set(tokenize(text)):
+                self._postings.setdefault(token, set()).add(pos)
+
+        self._vocabulary: List[str] = sorted(self._postings)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "\uffff", lo=start)
+        return self._vocabulary[start:end]
+
+    def search(self, query: str, limit: int = 20) -> List[CatalogEntry]:
+        """
+        All complete words must match exactly; the last word is treated as
+        a prefix (the instructor is probably still typing it).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return self.entries[:limit]
+
+        *words, prefix = tokens
+
+        # Intersect smallest posting lists first
+        candidates: Optional[Set[int]] = None
+        for word in sorted(words, key=lambda w: len(self._postings.get(w, ()))):
+            postings = self._postings.get(word)
+            if not postings:
+                return []
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return []
+
+        terms = self._prefix_terms(prefix)
+        if not terms:
+            return []
+
+        if candidates is None:
+            matches = set().union(*(self._postings[t] for t in terms))
+        elif len(candidates) * len(terms) < sum(len(self._postings[t]) for t in terms):
+            # Few candidates left: test each against the prefix terms
+            matches = {pos for pos in candidates if any(pos in self._postings[t] for t in terms)}
+        else:
+            matches = candidates & set().union(*(self._postings[t] for t in terms))
+
+        return [self.entries[pos] for pos in heapq.nsmallest(limit, matches)]
+
+
+# ----------------------------------------------------------------------
+# Process-wide cache
+# ----------------------------------------------------------------------
+
+_index: Optional[ExerciseIndex] = None
+_index_built_at: float = 0.0
+_index_generation = 0  # value of _generation the current index was built at
+_generation = 0  # bumped by every invalidate()
+_rebuilding = False
+_index_lock = threading.Lock()
+_cold_build_lock = threading.Lock()
+
+
+def invalidate():
+    """Mark the cached index stale; the next search triggers a rebuild"""
+    global _generation
+    _generation += 1
+
+
+@event.listens_for(Exercise, "after_insert")
+@event.listens_for(Exercise, "after_update")
+@event.listens_for(Exercise, "after_delete")
+def _on_exercise_change(mapper, connection, target):
+    # Only flag it here: rebuilding before COMMIT would re-read old rows
+    session = Session.object_session(target)
+    if session is not None:
+        session.info["exercises_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    if session.info.pop("exercises_changed", False):
+        invalidate()
+
+
+def _load_entries(db: Session) -> List[CatalogEntry]:
+    rows = db.query(
+        Exercise.id,
+        Exercise.title,
+        Exercise.description,
+        Exercise.language,
+        Exercise.tags
+    ).filter(Exercise.active == True).all()
+    return [CatalogEntry(*row) for row in rows]
+
+
+def _is_fresh() -> bool:
+    return (
+        _index_generation == _generation
+        and time.monotonic() - _index_built_at < settings.exercise_cache_ttl_seconds
+    )
+
+
+def rebuild(db: Optional[Session] = None) -> ExerciseIndex:
+    """Build a new index from the database and swap it in"""
+    global _index, _index_built_at, _index_generation
+
+    generation = _generation  # changes committed after this point make it stale again
+    if db is None:
+        db = SessionLocal()
+        try:
+            entries = _load_entries(db)
+        finally:
+            db.close()
+    else:
+        entries = _load_entries(db)
+
+    index = ExerciseIndex(entries)
+    with _index_lock:
+        _index, _index_built_at, _index_generation = index, time.monotonic(), generation
+    return index
+
+
+def warm_up():
+    """Build the index off the request path (app startup, stale index)"""
+    try:
+        rebuild()
+    except Exception as e:
+        # Keep serving the old index; the next search retries
+        print(f"Exercise index rebuild failed: {e}")
+
+
+def _rebuild_in_background():
+    global _rebuilding
+    try:
+        warm_up()
+    finally:
+        _rebuilding = False
+
+
+def get_index(db: Session) -> ExerciseIndex:
+    """
+    Return the cached index. A stale or expired index is still returned
+    while a background thread builds its replacement.
+    """
+    global _rebuilding
+
+    index = _index
+    if index is None:
+        # Cold start: nothing to serve yet, so build it here (once)
+        with _cold_build_lock:
+            return _index if _index is not None else rebuild(db)
+
+    if not _is_fresh():
+        with _index_lock:
+            start = not _rebuilding
+            _rebuilding = True
+        if start:
+            threading.Thread(target=_rebuild_in_background, name="exercise-index", daemon=True).start()
+    return index
+
+
+def search(db: Session, query: str, limit: int = 20) -> List[CatalogEntry]:
+    """Search active exercises by prefix/full text"""
+    return get_index(db).search(query, limit)
@@ -0,0 +1,242 @@
+"""
+Memory introspection for the admin API
+
+Reports entry counts and approximate deep sizes of the worker's in-process
+stores and caches, database pool status, and keeps a few tracemalloc
+snapshots to diff. Everything here is per worker process: with several
+workers, each response carries the pid it came from and snapshots can only
+be diffed within the same worker.
+
+Sizes are estimates: containers larger than ``SAMPLE_SIZE`` are sized from
+an evenly spaced sample of their items, and objects shared between stores
+are counted in each, so a report costs milliseconds even with 100k entries.
+"""
+import gc
+import itertools
+import math
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+
+SAMPLE_SIZE = 200
+
+_snapshots: "OrderedDict[int, dict]" = OrderedDict()
+_snapshot_ids = itertools.count(1)
+
+_ATOMIC = (str, bytes, bytearray, int, float, bool, type(None), datetime)
+
+
+def _items(obj):
+    if isinstance(obj, dict):
+        return obj.items()
+    if isinstance(obj, (list, tuple, set, frozenset)) or hasattr(obj, "maxlen"):  # maxlen: deque
+        return obj
+    return None
+
+
+def _sample(items) -> list:
+    # list() copies in one step, so stores changed by other threads
+    # cannot break the iteration
+    items = list(items)
+    if len(items) <= SAMPLE_SIZE:
+        return items
+    return items[::math.ceil(len(items) / SAMPLE_SIZE)]
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """Approximate bytes held by ``obj`` and everything it references"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC):
+        return size
+
+    items = _items(obj)
+    if items is not None:
+        count = len(obj)
+        sample = _sample(items)
+        if isinstance(obj, dict):
+            sampled = sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in sample)
+        else:
+            sampled = sum(deep_sizeof(item, seen) for item in sample)
+        return size + (sampled * count // len(sample) if sample else 0)
+
+    # Plain objects and dataclasses: size their attributes
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def _stores() -> Dict[str, Callable[[], Any]]:
+    """Every in-process store or cache worth watching, by name"""
+    from app.core import security
+    from app.services import exercise_catalog, jwks_refresher, launch_events, lti_service
+    from app.services.rate_limiter import MemoryBackend, limiter
+
+    return {
+        "lti.nonce_store": lambda: lti_service._nonce_store,
+        "lti.state_store": lambda: lti_service._state_store,
+        "lti.deep_link_store": lambda: lti_service._deep_link_store,
+        "lti.platform_jwks_cache": lambda: lti_service._jwks_cache,
+        "jwks_refresher.schedule": lambda: jwks_refresher._next_refresh,
+        "jwks_refresher.failures": lambda: jwks_refresher._failures,
+        "jwks_refresher.health": lambda: jwks_refresher._health,
+        "rate_limiter.buckets": lambda: limiter.backend._buckets if isinstance(limiter.backend, MemoryBackend) else None,
+        "rate_limiter.known_empty": lambda: getattr(limiter.backend, "_empty_until", None),
+        "exercise_catalog.index": lambda: exercise_catalog._index,
+        "launch_events.buffer": lambda: launch_events._buffer,
+        "security.tool_jwks": lambda: security.get_jwks() if security.get_jwks.cache_info().currsize else None,
+    }
+
+
+def store_report() -> Dict[str, dict]:
+    report = {}
+    for name, get in _stores().items():
+        obj = get()
+        if obj is None:
+            report[name] = {"entries": 0, "approx_bytes": 0}
+            continue
+        report[name] = {
+            "entries": len(obj) if hasattr(obj, "__len__") else 1,
+            "approx_bytes": deep_sizeof(obj)
+        }
+    return report
+
+
+def _pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__, "status": pool.status()}
+    for metric in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, metric):
+            status[metric] = getattr(pool, metric)()
+    return status
+
+
+def pool_report() -> Dict[str, dict]:
+    from app.db.session import async_engine, engine, replica_engines
+
+    pools = {
+        "sync": _pool_status(engine),
+        "async": _pool_status(async_engine.sync_engine),
+    }
+    for index, replica in enumerate(replica_engines):
+        pools[f"replica_{index}"] = _pool_status(replica.sync_engine)
+    return pools
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None  # not Linux
+    return None
+
+
+def memory_report() -> dict:
+    started = time.perf_counter()
+    report = {
+        "pid": os.getpid(),
+        "rss_bytes": _rss_bytes(),
+        "gc_counts": gc.get_count(),
+        "stores": store_report(),
+        "db_pools": pool_report(),
+        "tracemalloc": tracemalloc_status(),
+    }
+    report["report_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+# ----------------------------------------------------------------------
+# tracemalloc snapshots
+# ----------------------------------------------------------------------
+
+def tracemalloc_status() -> dict:
+    status = {"tracing": tracemalloc.is_tracing(), "snapshots": list(_snapshots)}
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        status.update({
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory()
+        })
+    return status
+
+
+def start_tracing(frames: int = 1):
+    """Start tracing allocations (costs CPU and memory until stopped)"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    """Stop tracing and drop all snapshots"""
+    tracemalloc.stop()
+    _snapshots.clear()
+
+
+def _stat(stat) -> dict:
+    return {
+        "where": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        "bytes": stat.size,
+        "count": stat.count,
+        **({"bytes_diff": stat.size_diff, "count_diff": stat.count_diff} if hasattr(stat, "size_diff") else {})
+    }
+
+
+def take_snapshot(key_type: str = "lineno", limit: int = 25) -> dict:
+    """Keep a snapshot (evicting the oldest past the limit) and return its top allocations"""
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not tracing; start it first")
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    snapshot_id = next(_snapshot_ids)
+    taken_at = datetime.now(timezone.utc).isoformat()
+    _snapshots[snapshot_id] = {"snapshot": snapshot, "taken_at": taken_at}
+    # Always keep the new one, even if the limit is set to 0
+    while len(_snapshots) > max(1, settings.admin_max_snapshots):
+        _snapshots.popitem(last=False)
+
+    stats = snapshot.statistics(key_type)
+    return {
+        "id": snapshot_id,
+        "taken_at": taken_at,
+        "total_bytes": sum(stat.size for stat in stats),
+        "top": [_stat(stat) for stat in stats[:limit]]
+    }
+
+
+def diff_snapshots(from_id: int, to_id: int, key_type: str = "lineno", limit: int = 25) -> Optional[dict]:
+    """Largest allocation changes between two kept snapshots (None if either is gone)"""
+    old, new = _snapshots.get(from_id), _snapshots.get(to_id)
+    if old is None or new is None:
+        return None
+
+    stats = new["snapshot"].compare_to(old["snapshot"], key_type)
+    return {
+        "from": {"id": from_id, "taken_at": old["taken_at"]},
+        "to": {"id": to_id, "taken_at": new["taken_at"]},
+        "total_bytes_diff": sum(stat.size_diff for stat in stats),
+        "top": [_stat(stat) for stat in stats[:limit]]
+    }
+
+
+def delete_snapshot(snapshot_id: int) -> bool:
+    return _snapshots.pop(snapshot_id, None) is not None
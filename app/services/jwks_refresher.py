@@ -0,0 +1,138 @@
+"""
+Background JWKS prefetch for active platforms.
+
+Started from the app lifespan. On startup every active platform's
+``key_set_url`` is fetched, so the first launch after a deploy does not pay
+for a cold fetch; afterwards each URL is refreshed once most of its TTL has
+passed. Refresh times are jittered so hundreds of platforms registered
+together do not all refresh in the same second, and at most
+``jwks_refresh_concurrency`` fetches run at once.
+
+Platforms sharing a key_set_url (e.g. every Canvas Cloud deployment) are
+fetched once per URL.
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.platform import Platform
+from app.services import lti_service
+
+# key_set_url -> refresh state
+_next_refresh: Dict[str, float] = {}
+_failures: Dict[str, int] = {}
+
+# platform_id -> health (last_success, last_error, key_count, ...)
+_health: Dict[str, dict] = {}
+
+
+def _load_active_platforms() -> List[Tuple[str, str]]:
+    db = SessionLocal()
+    try:
+        return db.query(Platform.id, Platform.key_set_url).filter(Platform.active == True).all()
+    finally:
+        db.close()
+
+
+def _schedule_after_success(url: str) -> float:
+    entry = lti_service._jwks_cache[url]
+    ttl = entry["expires_at"] - entry["fetched_at"]
+    lead = ttl * settings.jwks_refresh_before_expiry + random.uniform(0, ttl * settings.jwks_refresh_jitter)
+    return entry["expires_at"] - lead
+
+
+def _schedule_after_failure(url: str) -> float:
+    # Exponential backoff from 5s, capped at the poll interval x 10
+    failures = _failures.get(url, 0)
+    delay = min(5 * 2 ** failures, settings.jwks_refresh_poll_seconds * 10)
+    return time.time() + delay * random.uniform(0.8, 1.2)
+
+
+async def refresh_url(url: str, platform_ids: List[str], semaphore: asyncio.Semaphore):
+    """Fetch one key_set_url and record health for every platform using it"""
+    async with semaphore:
+        try:
+            jwks = await asyncio.to_thread(lti_service.fetch_platform_keys, url)
+        except Exception as e:
+            _failures[url] = _failures.get(url, 0) + 1
+            _next_refresh[url] = _schedule_after_failure(url)
+            for platform_id in platform_ids:
+                health = _health.setdefault(platform_id, {"key_set_url": url})
+                health["last_error"] = f"{type(e).__name__}: {e}"
+                health["last_error_at"] = time.time()
+                health["consecutive_failures"] = _failures[url]
+                health["next_refresh_at"] = _next_refresh[url]
+            print(f"JWKS refresh failed for {url}: {e}")
+            return
+
+    _failures.pop(url, None)
+    _next_refresh[url] = _schedule_after_success(url)
+    entry = lti_service._jwks_cache[url]
+    for platform_id in platform_ids:
+        health = _health.setdefault(platform_id, {"key_set_url": url})
+        health.update({
+            "key_set_url": url,
+            "last_success_at": entry["fetched_at"],
+            "expires_at": entry["expires_at"],
+            "next_refresh_at": _next_refresh[url],
+            "key_count": len(jwks.get("keys", [])),
+            "consecutive_failures": 0
+        })
+
+
+async def refresh_due(semaphore: Optional[asyncio.Semaphore] = None):
+    """Refresh every key_set_url that is missing, due or expired"""
+    semaphore = semaphore or asyncio.Semaphore(settings.jwks_refresh_concurrency)
+    platforms = await asyncio.to_thread(_load_active_platforms)
+
+    by_url: Dict[str, List[str]] = {}
+    for platform_id, url in platforms:
+        by_url.setdefault(url, []).append(platform_id)
+
+    # Forget platforms that were deactivated
+    active_ids = {platform_id for platform_id, _ in platforms}
+    for platform_id in list(_health):
+        if platform_id not in active_ids:
+            del _health[platform_id]
+
+    # A launch may have fetched a key set on its own: just schedule it
+    for url in by_url:
+        if url in lti_service._jwks_cache and url not in _next_refresh:
+            _next_refresh[url] = _schedule_after_success(url)
+
+    now = time.time()
+    due = [(url, ids) for url, ids in by_url.items() if now >= _next_refresh.get(url, 0)]
+
+    await asyncio.gather(*(refresh_url(url, ids, semaphore) for url, ids in due))
+
+
+async def run(stop: asyncio.Event):
+    """Refresh loop; returns once ``stop`` is set"""
+    semaphore = asyncio.Semaphore(settings.jwks_refresh_concurrency)
+    while not stop.is_set():
+        try:
+            await refresh_due(semaphore)
+        except Exception as e:
+            # e.g. database unavailable: keep serving from cache and retry
+            print(f"JWKS refresher error: {e}")
+
+        interval = settings.jwks_refresh_poll_seconds * random.uniform(0.9, 1.1)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def get_health() -> Dict[str, dict]:
+    """Refresh health per active platform, timestamps as ISO 8601 (UTC)"""
+    return {
+        platform_id: {
+            key: datetime.fromtimestamp(value, timezone.utc).isoformat() if key.endswith("_at") else value
+            for key, value in health.items()
+        }
+        for platform_id, health in _health.items()
+    }
@@ -0,0 +1,258 @@
+"""
+Launch event log and rollups.
+
+``record_launch`` only appends to an in-process buffer, so a launch never
+waits on the event log. The lifespan task (``run``) drains the buffer every
+``launch_event_flush_seconds``: each batch is one multi-row INSERT into
+``launch_events`` plus one ``INSERT ... ON CONFLICT DO UPDATE`` per rollup
+table adding the batch's counts, all in a single transaction. Dashboards
+read the hourly/daily rollups and never scan raw events. Every message
+type is logged, but only resource link launches are counted in the
+rollups: Deep Linking requests are instructors configuring the course.
+
+If the database is unavailable, batches go back to the front of the
+buffer; once the buffer is full the oldest events are dropped (and
+counted) rather than growing without bound.
+
+Retention: on PostgreSQL ``launch_events`` is partitioned by month and
+partitions older than ``launch_event_retention_days`` are dropped; other
+databases fall back to DELETE. Hourly rollups are pruned after
+``launch_rollup_hourly_retention_days``; daily rollups are kept.
+"""
+import asyncio
+import re
+import time
+import uuid
+from collections import Counter, deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.launch_event import LaunchEvent, LaunchRollupDaily, LaunchRollupHourly
+from app.services import lti_service
+
+_buffer: Deque[dict] = deque(maxlen=settings.launch_event_buffer_max)
+_partitions: Set[date] = set()  # months known to have a partition (PostgreSQL)
+_stats = {
+    "recorded": 0,
+    "flushed": 0,
+    "dropped": 0,
+    "last_flush_at": None,
+    "last_error": None
+}
+
+ROLLUP_MESSAGE_TYPE = "LtiResourceLinkRequest"  # only these count as launches in the rollups
+_PARTITION_NAME = re.compile(r"^launch_events_p(\d{4})_(\d{2})$")
+
+
+def _claim_id(claim) -> Optional[str]:
+    value = (claim or {}).get("id")
+    return str(value)[:255] if value is not None else None
+
+
+def record_launch(platform_id: str, payload: dict):
+    """Buffer a launch event; never touches the database"""
+    if not settings.launch_events_enabled:
+        return
+
+    if len(_buffer) == _buffer.maxlen:
+        _stats["dropped"] += 1
+    _stats["recorded"] += 1
+
+    deployment_id = payload.get(lti_service.DEPLOYMENT_ID_CLAIM)
+    _buffer.append({
+        "event_id": uuid.uuid4().hex,
+        "occurred_at": datetime.now(timezone.utc),
+        "platform_id": platform_id,
+        "deployment_id": str(deployment_id)[:255] if deployment_id is not None else None,
+        "lti_user_id": str(payload.get("sub"))[:255],
+        "context_id": _claim_id(payload.get(lti_service.CONTEXT_CLAIM)),
+        "resource_link_id": _claim_id(payload.get(lti_service.RESOURCE_LINK_CLAIM)),
+        "message_type": str(payload.get(lti_service.MESSAGE_TYPE_CLAIM, "LtiResourceLinkRequest"))[:64]
+    })
+
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"launch_events_p{month:%Y_%m}"
+
+
+def _dialect_insert(dialect: str):
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"Launch rollups not supported on {dialect}")
+
+
+def _upsert_counts(dialect: str, model, counts: Counter):
+    """INSERT the batch's counts, adding to existing rollup rows"""
+    stmt = _dialect_insert(dialect)(model).values([
+        {
+            "bucket": bucket,
+            "platform_id": platform_id,
+            "context_id": context_id,
+            "resource_link_id": resource_link_id,
+            "launches": launches
+        }
+        for (bucket, platform_id, context_id, resource_link_id), launches in counts.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[model.bucket, model.platform_id, model.context_id, model.resource_link_id],
+        set_={"launches": model.launches + stmt.excluded.launches}
+    )
+
+
+async def ensure_partitions(months: Iterable[date]):
+    """
+    Create monthly launch_events partitions (PostgreSQL only).
+
+    The DDL is committed in its own transaction before a month is recorded,
+    so a batch that later rolls back never leaves a month marked as
+    partitioned when its partition does not exist.
+    """
+    missing = sorted(set(months) - _partitions)
+    if not missing:
+        return
+
+    async with AsyncSessionLocal() as db:
+        for month in missing:
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} PARTITION OF launch_events "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{_next_month(month)} 00:00:00+00')"
+            ))
+        await db.commit()
+    _partitions.update(missing)
+
+
+async def _write_batch(batch: List[dict]):
+    hourly: Counter = Counter()
+    daily: Counter = Counter()
+    for event in batch:
+        if event["message_type"] != ROLLUP_MESSAGE_TYPE:
+            continue  # e.g. an instructor opening the deep linking picker
+        occurred_at = event["occurred_at"]
+        key = (event["platform_id"], event["context_id"] or "", event["resource_link_id"] or "")
+        hourly[(occurred_at.replace(minute=0, second=0, microsecond=0),) + key] += 1
+        daily[(occurred_at.date(),) + key] += 1
+
+    months = {_month_start(event["occurred_at"]) for event in batch}
+    async with AsyncSessionLocal() as db:
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            await ensure_partitions(months)
+        try:
+            await db.execute(insert(LaunchEvent), batch)
+            if hourly:
+                await db.execute(_upsert_counts(dialect, LaunchRollupHourly, hourly))
+                await db.execute(_upsert_counts(dialect, LaunchRollupDaily, daily))
+            await db.commit()
+        except Exception:
+            # The partition may have been dropped behind our back (retention
+            # in another worker, manual DDL): check again on the retry
+            _partitions.difference_update(months)
+            raise
+
+
+def _requeue(batch: List[dict]):
+    """Put an unwritten batch back at the front, keeping the newest events"""
+    space = _buffer.maxlen - len(_buffer)
+    if len(batch) > space:
+        _stats["dropped"] += len(batch) - space
+        batch = batch[len(batch) - space:]
+    _buffer.extendleft(reversed(batch))
+
+
+async def flush() -> int:
+    """Write all buffered events in batches; returns how many were written"""
+    written = 0
+    while _buffer:
+        batch = [_buffer.popleft() for _ in range(min(len(_buffer), settings.launch_event_batch_size))]
+        try:
+            await _write_batch(batch)
+        except Exception as e:
+            _requeue(batch)
+            _stats["last_error"] = f"{type(e).__name__}: {e}"
+            print(f"Launch event flush failed, {len(_buffer)} events buffered: {e}")
+            break
+        written += len(batch)
+        _stats["flushed"] += len(batch)
+        _stats["last_flush_at"] = datetime.now(timezone.utc).isoformat()
+    return written
+
+
+async def _list_partitions(db: AsyncSession) -> Dict[str, date]:
+    rows = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'launch_events'"
+    ))
+    partitions = {}
+    for (name,) in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return partitions
+
+
+async def apply_retention(now: Optional[datetime] = None) -> dict:
+    """Drop expired event partitions (or rows) and prune hourly rollups"""
+    now = now or datetime.now(timezone.utc)
+    event_cutoff = now - timedelta(days=settings.launch_event_retention_days)
+    hourly_cutoff = now - timedelta(days=settings.launch_rollup_hourly_retention_days)
+    result = {"dropped_partitions": [], "deleted_events": 0, "deleted_hourly": 0}
+
+    async with AsyncSessionLocal() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            # Keep this month and the next one ready so inserts never wait on DDL
+            this_month = _month_start(now)
+            await ensure_partitions([this_month, _next_month(this_month)])
+            for name, month in (await _list_partitions(db)).items():
+                if _next_month(month) <= event_cutoff.date():
+                    await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                    _partitions.discard(month)
+                    result["dropped_partitions"].append(name)
+        else:
+            deleted = await db.execute(delete(LaunchEvent).where(LaunchEvent.occurred_at < event_cutoff))
+            result["deleted_events"] = deleted.rowcount
+
+        deleted = await db.execute(delete(LaunchRollupHourly).where(LaunchRollupHourly.bucket < hourly_cutoff))
+        result["deleted_hourly"] = deleted.rowcount
+        await db.commit()
+    return result
+
+
+async def run(stop: asyncio.Event):
+    """Flush loop; flushes once more and returns after ``stop`` is set"""
+    next_maintenance = 0.0
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.launch_event_flush_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+        await flush()
+
+        if time.monotonic() >= next_maintenance and not stop.is_set():
+            try:
+                await apply_retention()
+            except Exception as e:
+                print(f"Launch event retention failed: {e}")
+            next_maintenance = time.monotonic() + 3600
+
+
+def get_stats() -> dict:
+    return {"buffered": len(_buffer), "capacity": _buffer.maxlen, **_stats}
@@ -1,19 +1,34 @@
+import re
 import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.models.platform import Platform
 
 import jwt
 import requests
 from typing import Dict, Any
-from jose import jwk
-from jose.backends import RSAKey
-from jose import jwt as jose_jwt
 
 # In-memory storage for nonces and state (use Redis in production)
 _nonce_store: Dict[str, datetime] = {}
 _state_store: Dict[str, dict] = {}
+_deep_link_store: Dict[str, dict] = {}
+_last_purge = datetime.min
+
+# Platform JWKS by key_set_url: {"jwks", "fetched_at", "expires_at"} (epoch seconds)
+_jwks_cache: Dict[str, dict] = {}
+
+# LTI claim names
+MESSAGE_TYPE_CLAIM = "https://purl.imsglobal.org/spec/lti/claim/message_type"
+DEPLOYMENT_ID_CLAIM = "https://purl.imsglobal.org/spec/lti/claim/deployment_id"
+CONTEXT_CLAIM = "https://purl.imsglobal.org/spec/lti/claim/context"
+RESOURCE_LINK_CLAIM = "https://purl.imsglobal.org/spec/lti/claim/resource_link"
+DEEP_LINKING_SETTINGS_CLAIM = "https://purl.imsglobal.org/spec/lti-dl/claim/deep_linking_settings"
+CONTENT_ITEMS_CLAIM = "https://purl.imsglobal.org/spec/lti-dl/claim/content_items"
+DEEP_LINKING_DATA_CLAIM = "https://purl.imsglobal.org/spec/lti-dl/claim/data"
 
 def generate_nonce() -> str:
     """Generate cryptographically secure nonce"""
@@ -41,8 +56,25 @@ def validate_nonce(nonce: str) -> bool:
     del _nonce_store[nonce]
     return True
 
+def purge_expired(min_interval_seconds: int = 60):
+    """Drop expired nonces/states that were never used (abandoned logins)"""
+    global _last_purge
+    now = datetime.utcnow()
+    if (now - _last_purge).total_seconds() < min_interval_seconds:
+        return
+    _last_purge = now
+    
+    for nonce, expiry in list(_nonce_store.items()):
+        if now > expiry:
+            _nonce_store.pop(nonce, None)
+    for store in (_state_store, _deep_link_store):
+        for key, info in list(store.items()):
+            if now > info["expiry"]:
+                store.pop(key, None)
+
 def store_state(state: str, data: dict, expiry_minutes: int = 10):
     """Store state with associated data"""
+    purge_expired()
     _state_store[state] = {
         "data": data,
         "expiry": datetime.utcnow() + timedelta(minutes=expiry_minutes)
@@ -64,38 +96,107 @@ def get_state_data(state: str) -> Optional[dict]:
     del _state_store[state]
     return data
 
-def get_platform_by_issuer(db: Session, issuer: str) -> Optional[Platform]:
+def peek_state(state: str) -> Optional[dict]:
+    """State data if the state is valid, without consuming it"""
+    state_info = _state_store.get(state)
+    if state_info is None or datetime.utcnow() > state_info["expiry"]:
+        return None
+    return state_info["data"]
+
+def store_deep_link_session(data: dict, expiry_minutes: int = 60) -> str:
+    """Remember a Deep Linking request while the instructor picks exercises"""
+    token = secrets.token_urlsafe(32)
+    _deep_link_store[token] = {
+        "data": data,
+        "expiry": datetime.utcnow() + timedelta(minutes=expiry_minutes)
+    }
+    return token
+
+def pop_deep_link_session(token: str) -> Optional[dict]:
+    """Retrieve and consume a Deep Linking session (one-time use)"""
+    session_info = _deep_link_store.pop(token, None)
+    if not session_info or datetime.utcnow() > session_info["expiry"]:
+        return None
+    return session_info["data"]
+
+async def get_platform_by_issuer(db: AsyncSession, issuer: str) -> Optional[Platform]:
     """Get platform by issuer URL or fallback to first active platform"""
     # First try to match by ID (if issuer matches a platform ID)
-    platform = db.query(Platform).filter(
+    platform = (await db.execute(select(Platform).where(
         Platform.id == issuer,
         Platform.active == True
-    ).first()
+    ))).scalars().first()
     
     if platform:
         return platform
     
     # If not found, return the first active platform as fallback
     # (This works for single-platform setups)
-    return db.query(Platform).filter(Platform.active == True).first()
+    return (await db.execute(select(Platform).where(Platform.active == True))).scalars().first()
+
+async def get_active_platform(db: AsyncSession, client_id: str) -> Optional[Platform]:
+    """Active platform registered with this client_id"""
+    return (await db.execute(select(Platform).where(
+        Platform.client_id == client_id,
+        Platform.active == True
+    ))).scalars().first()
     
 
 
 
+def _cache_ttl(cache_control: Optional[str]) -> float:
+    """TTL from the JWKS response's Cache-Control max-age, clamped to our bounds"""
+    ttl = settings.jwks_cache_ttl_seconds
+    if cache_control:
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match:
+            ttl = int(match.group(1))
+    return float(min(max(ttl, settings.jwks_min_ttl_seconds), settings.jwks_max_ttl_seconds))
+
 def fetch_platform_keys(key_set_url: str) -> Dict[str, Any]:
-    """Fetch platform's public keys from JWKS endpoint"""
+    """Fetch platform's public keys from JWKS endpoint and cache them"""
     response = requests.get(key_set_url, timeout=10)
     response.raise_for_status()
-    return response.json()
+    jwks = response.json()
+    
+    now = time.time()
+    _jwks_cache[key_set_url] = {
+        "jwks": jwks,
+        "fetched_at": now,
+        "expires_at": now + _cache_ttl(response.headers.get("Cache-Control"))
+    }
+    return jwks
+
+def get_platform_keys(key_set_url: str, kid: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Platform's public keys, from cache when fresh.
+    
+    An unknown kid usually means the platform rotated its keys, so it
+    forces a refetch - at most once per jwks_min_ttl_seconds, so bogus
+    kids cannot be used to hammer the platform.
+    """
+    entry = _jwks_cache.get(key_set_url)
+    now = time.time()
+    if entry and now < entry["expires_at"]:
+        if kid is None or any(k.get("kid") == kid for k in entry["jwks"].get("keys", [])):
+            return entry["jwks"]
+        if now - entry["fetched_at"] < settings.jwks_min_ttl_seconds:
+            return entry["jwks"]
+    return fetch_platform_keys(key_set_url)
 
-def get_key_by_kid(jwks: Dict[str, Any], kid: str):
-    """Find a specific key in a JWKS dictionary and construct a Jose key object"""
+def get_key_by_kid(jwks: Dict[str, Any], kid: str) -> Optional[jwt.PyJWK]:
+    """
+    Find a specific key in a JWKS dictionary.
+    
+    RSA, EC (P-256/384/521) and OKP (Ed25519) keys are supported; without an
+    "alg" member the algorithm follows from the key type (RSA -> RS256).
+    """
     for key in jwks.get("keys", []):
         if key.get("kid") == kid:
-            if "alg" not in key:
-                key["alg"] = "RS256"
-            # FIX: Use 'jwk' instead of 'jose_jwt'
-            return jwk.construct(key) 
+            try:
+                return jwt.PyJWK(key)
+            except jwt.PyJWKError as e:
+                raise ValueError(f"Unusable key '{kid}' in platform JWKS: {e}")
     
     return None
 
@@ -122,8 +223,8 @@ def validate_jwt_token(
     if not kid:
         raise ValueError("Token missing 'kid' in header")
     
-    # Fetch platform's public keys
-    platform_keys = fetch_platform_keys(platform.key_set_url)
+    # Platform's public keys (normally prefetched by the JWKS refresher)
+    platform_keys = get_platform_keys(platform.key_set_url, kid)
     
     # Get the specific key
     public_key = get_key_by_kid(platform_keys, kid)
@@ -132,10 +233,11 @@ def validate_jwt_token(
     
     # Verify and decode token
     try:
+        # Only the key's own algorithm is accepted (no alg confusion)
         payload = jwt.decode(
             token,
-            public_key.to_pem().decode('utf-8'),
-            algorithms=["RS256"],
+            public_key.key,
+            algorithms=[public_key.algorithm_name],
             audience=expected_client_id,
             options={
                 "verify_signature": True,
@@ -0,0 +1,169 @@
+"""
+Bulk platform onboarding
+
+Rows arrive as JSONL or CSV, are validated with ``PlatformCreate`` and written
+in chunks with a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING id``
+per chunk, so importing thousands of deployments costs one round trip per
+chunk instead of a SELECT + INSERT per row.
+"""
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.platform import Platform
+from app.schemas.platform import PlatformCreate
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def platform_values(platform: PlatformCreate) -> Dict[str, Any]:
+    """Column values for a validated platform (HttpUrl -> str)"""
+    data = platform.model_dump()
+    data["auth_login_url"] = str(data["auth_login_url"])
+    data["auth_token_url"] = str(data["auth_token_url"])
+    data["key_set_url"] = str(data["key_set_url"])
+    return data
+
+
+def parse_rows(
+    lines: Iterable[str],
+    fmt: str,
+    fieldnames: Optional[List[str]] = None,
+    first_line: int = 1
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (line_number, row) from JSONL or CSV text lines.
+
+    For CSV, ``fieldnames`` lets a caller feeding the input in pieces pass
+    the header it already consumed; otherwise the first line is the header.
+    Rows that cannot be parsed are yielded as an Exception so the caller
+    can report them alongside validation errors.
+    """
+    if fmt == "jsonl":
+        for line_no, line in enumerate(lines, start=first_line):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, e
+    elif fmt == "csv":
+        reader = csv.DictReader(lines, fieldnames=fieldnames)
+        for row in reader:
+            # Empty cells mean "not provided", not empty string
+            yield first_line - 1 + reader.line_num, {
+                k: v for k, v in row.items() if k is not None and v not in (None, "")
+            }
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _insert_ignoring_conflicts(dialect: str, values: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT (id) DO NOTHING RETURNING id"""
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise RuntimeError(f"Bulk import not supported on {dialect}")
+
+    return insert(Platform).values(values).on_conflict_do_nothing(
+        index_elements=[Platform.id]
+    ).returning(Platform.id)
+
+
+def validate_chunk(chunk: List[Tuple[int, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Tuple[int, Dict[str, Any]]]]:
+    """Split a chunk into per-row error results and valid rows keyed by id"""
+    results: List[Dict[str, Any]] = []
+    valid: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+    for line_no, row in chunk:
+        if isinstance(row, Exception):
+            results.append({"line": line_no, "status": "invalid", "errors": [str(row)]})
+            continue
+        try:
+            platform = PlatformCreate.model_validate(row)
+        except ValidationError as e:
+            results.append({
+                "line": line_no,
+                "id": row.get("id") if isinstance(row, dict) else None,
+                "status": "invalid",
+                "errors": [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+            })
+            continue
+
+        if platform.id in valid:
+            results.append({"line": line_no, "id": platform.id, "status": "duplicate"})
+            continue
+        valid[platform.id] = (line_no, platform_values(platform))
+
+    return results, valid
+
+
+def _chunk_results(results, valid, inserted: set) -> List[Dict[str, Any]]:
+    for platform_id, (line_no, _) in valid.items():
+        results.append({
+            "line": line_no,
+            "id": platform_id,
+            "status": "created" if platform_id in inserted else "exists"
+        })
+    results.sort(key=lambda r: r["line"])
+    return results
+
+
+def import_chunk(db: Session, chunk: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+    """Validate and insert one chunk of rows; returns a result per row"""
+    results, valid = validate_chunk(chunk)
+    inserted = set()
+    if valid:
+        stmt = _insert_ignoring_conflicts(
+            db.get_bind().dialect.name,
+            [values for _, values in valid.values()]
+        )
+        inserted = set(db.execute(stmt).scalars())
+        db.commit()
+    return _chunk_results(results, valid, inserted)
+
+
+async def import_chunk_async(db: AsyncSession, chunk: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+    """Async variant of import_chunk"""
+    results, valid = validate_chunk(chunk)
+    inserted = set()
+    if valid:
+        stmt = _insert_ignoring_conflicts(
+            db.get_bind().dialect.name,
+            [values for _, values in valid.values()]
+        )
+        inserted = set((await db.execute(stmt)).scalars())
+        await db.commit()
+    return _chunk_results(results, valid, inserted)
+
+
+def chunked(rows: Iterable[Tuple[int, Any]], chunk_size: int) -> Iterator[List[Tuple[int, Any]]]:
+    chunk: List[Tuple[int, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_platforms(
+    db: Session,
+    lines: Iterable[str],
+    fmt: str = "jsonl",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fieldnames: Optional[List[str]] = None,
+    first_line: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """Import platforms from JSONL/CSV lines, yielding a result per row"""
+    rows = parse_rows(lines, fmt, fieldnames=fieldnames, first_line=first_line)
+    for chunk in chunked(rows, chunk_size):
+        yield from import_chunk(db, chunk)
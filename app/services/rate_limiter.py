@@ -0,0 +1,215 @@
+"""
+Token-bucket admission control for the unauthenticated LTI endpoints.
+
+Every bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second; a request spends one token or is rejected. A bucket that has been
+idle long enough to refill completely is indistinguishable from a new one,
+which is what lets both backends forget buckets without changing behaviour:
+
+- ``MemoryBackend`` keeps buckets in an LRU-bounded dict (per worker)
+- ``DatabaseBackend`` keeps them in the ``rate_limit_buckets`` table, so all
+  workers pointed at the same database share one budget
+
+``take`` is a coroutine on both backends: the database one uses the async
+engine, so admission on the async LTI routes never holds a threadpool
+thread while it waits on the bucket's row lock.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.rate_limit import RateLimitBucket
+
+
+@dataclass
+class Limit:
+    rate: float  # tokens per second
+    burst: int   # bucket capacity
+
+
+def _refill(tokens: float, updated_at: float, now: float, limit: Limit) -> float:
+    return min(float(limit.burst), tokens + (now - updated_at) * limit.rate)
+
+
+class MemoryBackend:
+    """Per-process buckets, evicting least recently used past max_buckets"""
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    async def take(self, key: str, limit: Limit, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (float(limit.burst), now))
+            tokens = _refill(tokens, updated_at, now, limit)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+        return allowed, tokens
+
+
+class DatabaseBackend:
+    """
+    Buckets stored in the application database, shared across workers.
+
+    Once the database rejects a key, this worker knows the bucket cannot
+    hold a whole token again before ``now + (1 - tokens) / rate`` (other
+    workers only ever spend tokens), so until then it rejects that key
+    locally without a transaction. A flood of rejected requests costs one
+    write per key per refill interval per worker, not one per request.
+    """
+
+    def __init__(self, max_buckets: int, max_idle_seconds: float = 3600):
+        self.max_buckets = max_buckets
+        self.max_idle_seconds = max_idle_seconds
+        self._takes = 0
+        self._empty_until: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _known_empty(self, key: str, limit: Limit, now: float):
+        """Tokens left if the key is known to be empty, else None"""
+        with self._lock:
+            until = self._empty_until.get(key)
+            if until is None:
+                return None
+            if now >= until:
+                del self._empty_until[key]
+                return None
+        return 1 - (until - now) * limit.rate
+
+    def _mark_empty(self, key: str, tokens: float, limit: Limit, now: float):
+        if not limit.rate:
+            return  # never refills: let the database keep answering
+        with self._lock:
+            self._empty_until.pop(key, None)
+            self._empty_until[key] = now + (1 - tokens) / limit.rate
+            while len(self._empty_until) > self.max_buckets:
+                self._empty_until.popitem(last=False)
+
+    async def take(self, key: str, limit: Limit, now: float) -> Tuple[bool, float]:
+        tokens = self._known_empty(key, limit, now)
+        if tokens is not None:
+            return False, tokens
+
+        async with AsyncSessionLocal() as db:
+            for _ in range(2):
+                bucket = (await db.execute(
+                    select(RateLimitBucket).where(RateLimitBucket.key == key).with_for_update()
+                )).scalar_one_or_none()
+
+                if bucket is None:
+                    bucket = RateLimitBucket(key=key, tokens=float(limit.burst), updated_at=now)
+                    db.add(bucket)
+
+                tokens = _refill(bucket.tokens, bucket.updated_at, now, limit)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                bucket.tokens = tokens
+                bucket.updated_at = now
+
+                try:
+                    await db.commit()
+                    break
+                except IntegrityError:
+                    # Another worker created the same bucket first; retry on its row
+                    await db.rollback()
+            else:
+                # Nothing was stored, so nothing was spent: reject rather than
+                # admit a request the shared budget never accounted for
+                print(f"Rate limit bucket {key} could not be updated, rejecting")
+                return False, 0.0
+
+            if not allowed:
+                self._mark_empty(key, tokens, limit, now)
+
+            self._takes += 1
+            if self._takes % 1000 == 0:
+                await self._prune(db, now)
+            return allowed, tokens
+
+    async def _prune(self, db: AsyncSession, now: float):
+        """Drop buckets that have refilled completely, then cap the table size"""
+        await db.execute(delete(RateLimitBucket).where(
+            RateLimitBucket.updated_at < now - self.max_idle_seconds
+        ))
+
+        cutoff = (await db.execute(
+            select(RateLimitBucket.updated_at)
+            .order_by(RateLimitBucket.updated_at.desc())
+            .offset(self.max_buckets)
+            .limit(1)
+        )).scalar()
+        if cutoff is not None:
+            await db.execute(delete(RateLimitBucket).where(RateLimitBucket.updated_at <= cutoff))
+        await db.commit()
+
+
+class RateLimiter:
+    def __init__(self, backend, limits: Dict[str, Limit]):
+        self.backend = backend
+        self.limits = limits
+        self.stats: Counter = Counter()
+
+    async def check(self, scope: str, key: str) -> Tuple[bool, float]:
+        """
+        Spend one token from the ``scope`` bucket for ``key``.
+
+        Returns (allowed, retry_after_seconds).
+        """
+        limit = self.limits[scope]
+        allowed, tokens = await self.backend.take(f"{scope}:{key}", limit, time.time())
+
+        if allowed:
+            self.stats[f"{scope}_allowed"] += 1
+            return True, 0.0
+
+        self.stats[f"{scope}_rejected"] += 1
+        retry_after = (1 - tokens) / limit.rate if limit.rate else 60.0
+        return False, retry_after
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "buckets": len(self.backend) if isinstance(self.backend, MemoryBackend) else None,
+            "counters": dict(self.stats),
+        }
+
+
+def _create_limiter() -> RateLimiter:
+    limits = {
+        "ip": Limit(settings.rate_limit_ip_per_second, settings.rate_limit_ip_burst),
+        "client": Limit(settings.rate_limit_client_per_second, settings.rate_limit_client_burst),
+    }
+
+    if settings.rate_limit_backend == "memory":
+        backend = MemoryBackend(settings.rate_limit_max_buckets)
+    elif settings.rate_limit_backend == "database":
+        # Time for the slowest bucket to refill from empty
+        max_idle = max((limit.burst / limit.rate for limit in limits.values() if limit.rate), default=3600)
+        backend = DatabaseBackend(settings.rate_limit_max_buckets, max_idle)
+    else:
+        raise ValueError(f"Unknown rate_limit_backend: {settings.rate_limit_backend}")
+
+    return RateLimiter(backend, limits)
+
+
+limiter = _create_limiter()
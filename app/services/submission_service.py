@@ -0,0 +1,46 @@
+from functools import lru_cache
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.submission import Submission
+from app.services.blob_store import BlobStore
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    """Blob store configured from settings (one per process)"""
+    return BlobStore(
+        settings.blob_store_path,
+        compression=settings.blob_compression,
+        compression_level=settings.blob_compression_level,
+        mmap_threshold=settings.blob_mmap_threshold,
+    )
+
+def create_submission(db: Session, user_id: int, exercise_id: str, content: bytes) -> Submission:
+    """Store submission content (deduplicated) and record its metadata row"""
+    blob = get_blob_store().put(content)
+
+    submission = Submission(
+        user_id=user_id,
+        exercise_id=exercise_id,
+        blob_hash=blob.hash,
+        size=blob.size
+    )
+    db.add(submission)
+    db.commit()
+    db.refresh(submission)
+    return submission
+
+def read_submission(submission: Submission) -> bytes:
+    """Return the raw content of a submission"""
+    return get_blob_store().read(submission.blob_hash)
+
+def collect_garbage(db: Session) -> int:
+    """Remove blobs no submission row references; returns number deleted"""
+    referenced = {
+        row[0] for row in db.query(Submission.blob_hash).distinct()
+    }
+    return get_blob_store().collect_garbage(
+        referenced,
+        grace_seconds=settings.blob_gc_grace_seconds
+    )
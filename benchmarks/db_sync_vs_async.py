@@ -0,0 +1,102 @@
+"""
+Sync vs async DB route throughput at high concurrency.
+
+Serves the same platform lookup from a sync route (SessionLocal, runs in
+the threadpool) and an async route (AsyncSessionLocal, runs on the event
+loop), and drives each with N concurrent in-process clients.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.db_sync_vs_async --concurrency 200 --sleep-ms 20
+
+--sleep-ms adds a server-side pg_sleep() to every query to stand in for a
+busy or distant database; that is where the threadpool (40 threads by
+default) becomes the ceiling for the sync route. It is ignored on SQLite,
+where results mostly reflect aiosqlite's per-connection thread overhead.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, engine, get_async_db, get_db
+from app.models.platform import Platform
+
+PLATFORM_ID = "https://benchmark.example.edu"
+
+
+def build_app(sleep_sql) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_lookup(db: Session = Depends(get_db)):
+        if sleep_sql is not None:
+            db.execute(sleep_sql)
+        return db.execute(select(Platform.name).where(Platform.id == PLATFORM_ID)).scalar_one()
+
+    @app.get("/async")
+    async def async_lookup(db: AsyncSession = Depends(get_async_db)):
+        if sleep_sql is not None:
+            await db.execute(sleep_sql)
+        return (await db.execute(select(Platform.name).where(Platform.id == PLATFORM_ID))).scalar_one()
+
+    return app
+
+
+async def seed():
+    Base.metadata.create_all(bind=engine)
+    async with AsyncSessionLocal() as db:
+        if await db.get(Platform, PLATFORM_ID) is None:
+            db.add(Platform(
+                id=PLATFORM_ID,
+                name="Benchmark",
+                client_id="benchmark",
+                auth_login_url="https://benchmark.example.edu/auth",
+                auth_token_url="https://benchmark.example.edu/token",
+                key_set_url="https://benchmark.example.edu/jwks",
+            ))
+            await db.commit()
+
+
+async def drive(client: httpx.AsyncClient, path: str, concurrency: int, requests: int) -> float:
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.get(path)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sleep-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    sleep_sql = None
+    if args.sleep_ms and engine.dialect.name == "postgresql":
+        sleep_sql = text(f"SELECT pg_sleep({args.sleep_ms / 1000})")
+
+    await seed()
+    app = build_app(sleep_sql)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/sync", "/async"):
+            await drive(client, path, args.concurrency, min(200, args.requests))  # warm up pools
+            rps = await drive(client, path, args.concurrency, args.requests)
+            print(f"{path:<7} {args.concurrency:>5} concurrent  {rps:>9.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
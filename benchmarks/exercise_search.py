@@ -0,0 +1,62 @@
+"""
+Exercise catalog search latency at catalog scale.
+
+    python -m benchmarks.exercise_search --exercises 50000
+
+Target: every query well under 10ms at 50k exercises.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.exercise_catalog import CatalogEntry, ExerciseIndex
+
+WORDS = (
+    "array list string loop recursion sort search binary tree graph hash map "
+    "queue stack linked heap dynamic programming greedy matrix fizzbuzz palindrome "
+    "prime fibonacci parser regex file io class object inheritance closure generator "
+    "async thread socket http json csv sql join index window cursor pointer memory"
+).split()
+LANGUAGES = ["python", "java", "javascript", "c", "cpp", "go", "rust", "sql"]
+QUERIES = ["f", "fi", "fib", "python", "python so", "python sort", "binary tree",
+           "java linked li", "sql window", "zzz", "a", "recursion fibonacci python"]
+
+
+def build_entries(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(n):
+        title = " ".join(rng.sample(WORDS, 3)).title()
+        yield CatalogEntry(
+            id=f"exercise-{i}",
+            title=title,
+            description=" ".join(rng.choices(WORDS, k=20)),
+            language=rng.choice(LANGUAGES),
+            tags=",".join(rng.sample(WORDS, 2)),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exercises", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = ExerciseIndex(build_entries(args.exercises))
+    print(f"Built index of {len(index)} exercises in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"{'query':<30} {'hits':>5} {'p50 ms':>8} {'p99 ms':>8}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            hits = index.search(query, limit=20)
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        print(f"{query!r:<30} {len(hits):>5} {statistics.median(timings):>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
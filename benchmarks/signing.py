@@ -0,0 +1,66 @@
+"""
+Tool JWT signing throughput per algorithm, on one core.
+
+Signs a deep-linking-sized payload with each tool key (RS256, ES256, EdDSA)
+through app.core.security.sign_jwt, and also reports verification speed,
+which is what the platform pays for each message.
+
+    python -m benchmarks.signing --seconds 2
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import jwt
+
+from app.core.security import SIGNING_KEYS, load_signing_key, sign_jwt
+
+
+def payload() -> dict:
+    now = datetime.utcnow()
+    return {
+        "iss": "benchmark-client",
+        "aud": "https://benchmark.example.edu",
+        "iat": now,
+        "exp": now + timedelta(minutes=5),
+        "nonce": "n" * 43,
+        "https://purl.imsglobal.org/spec/lti/claim/message_type": "LtiDeepLinkingResponse",
+        "https://purl.imsglobal.org/spec/lti/claim/version": "1.3.0",
+        "https://purl.imsglobal.org/spec/lti-dl/claim/content_items": [
+            {"type": "ltiResourceLink", "title": f"Exercise {i}", "custom": {"exercise_id": f"ex{i}"}}
+            for i in range(5)
+        ],
+    }
+
+
+def rate(fn, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(10):
+            fn()
+        count += 10
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=2.0, help="per algorithm and operation")
+    args = parser.parse_args()
+
+    claims = payload()
+    print(f"{'alg':<7} {'sign/s':>10} {'verify/s':>10} {'token bytes':>12}")
+    for algorithm in SIGNING_KEYS:
+        public_key = load_signing_key(algorithm).public_key()
+        token = sign_jwt(claims, algorithm)
+        signs = rate(lambda: sign_jwt(claims, algorithm), args.seconds)
+        verifies = rate(
+            lambda: jwt.decode(token, public_key, algorithms=[algorithm], audience=claims["aud"]),
+            args.seconds
+        )
+        print(f"{algorithm:<7} {signs:>10.0f} {verifies:>10.0f} {len(token):>12}")
+
+
+if __name__ == "__main__":
+    main()